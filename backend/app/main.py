@@ -18,6 +18,14 @@ from app.routers.ilef import models_router
 from app.routers.sirine.router import router as sirine_router
 from app.routers.ilyes import remote, clustering as ilyes_clustering
 from app.routers.yassine.app import router as hr_router
+from app.services.model_registry import registry
+from app.services.batching import batching_status
+from app.services.embeddings import embeddings_status
+from app.services.execution import execution_status
+from app.services.text_cache import text_cache_status
+
+# MODEL_PRELOAD: load artifacts at import time so forked workers share them
+registry.preload_from_env()
 
 app = FastAPI()
 
@@ -46,6 +54,32 @@ app.include_router(remote.router, prefix="/remote")
 app.include_router(ilyes_clustering.router, prefix="/ilyes_clustering")
 app.include_router(hr_router)
 
+@app.on_event("startup")
+def warmup_models():
+    # Models load lazily on first request; MODEL_WARMUP="ahmed.*,sirine.dataset"
+    # preloads the listed artifacts in the background instead.
+    registry.warmup_from_env()
+
 @app.get("/")
 def root():
-    return {"message": "Backend is running"}
\ No newline at end of file
+    return {"message": "Backend is running"}
+
+@app.get("/models/status")
+def models_status():
+    return registry.status()
+
+@app.get("/models/batching")
+def models_batching():
+    # Per-model micro-batching metrics (see app/services/batching.py)
+    return batching_status()
+
+@app.get("/execution/status")
+def execution_state():
+    # CPU pool size and per-route concurrency/queue/429 counters (see app/services/execution.py)
+    return execution_status()
+
+@app.get("/models/text-cache")
+def models_text_cache():
+    # Hit/miss counters of the shared text -> TF-IDF row cache (see app/services/text_cache.py)
+    # and of the sentence-embedding caches (app/services/embeddings.py)
+    return {**text_cache_status(), "embeddings": embeddings_status()}
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import pandas as pd, pickle, os
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import numpy as np, pandas as pd, pickle, os, io
+from app.services.model_registry import registry
+from app.services.batching import batcher
+from app.services.execution import route_limit
 
 router=APIRouter()
 MD=os.path.dirname(__file__)
 
-scaler=pickle.load(open(os.path.join(MD,"attrition_scaler.pkl"),"rb"))
-model=pickle.load(open(os.path.join(MD,"attrition_model.pkl"),"rb"))
-features=list(pickle.load(open(os.path.join(MD,"attrition_features.pkl"),"rb")))
+def _pkl(name):
+    with open(os.path.join(MD,name),"rb") as f: return pickle.load(f)
+
+_scaler=registry.register("ahmed.attrition.scaler",lambda:_pkl("attrition_scaler.pkl"))
+_model=registry.register("ahmed.attrition.model",lambda:_pkl("attrition_model.pkl"))
+_features=registry.register("ahmed.attrition.features",lambda:list(_pkl("attrition_features.pkl")))
 
 def _check_pkls():
+    scaler,model,features=_scaler.get(),_model.get(),_features.get()
     out={"ok":True,"errors":[]}
     n=getattr(scaler,"n_features_in_",None)
     if n is not None and int(n)!=len(features): out["ok"]=False;out["errors"].append({"type":"scaler_n_features_mismatch"})
@@ -21,7 +28,12 @@ def _check_pkls():
         out["ok"]=False;out["errors"].append({"type":"pipeline_smoke_test","error":str(ex)})
     return out
 
-_pkl_check=_check_pkls()
+_pkl_check=None
+
+def _get_pkl_check():
+    global _pkl_check
+    if _pkl_check is None: _pkl_check=_check_pkls()
+    return _pkl_check
 
 class InputData(BaseModel):
     Age:int;Years_at_Company:int;Monthly_Income:float;Number_of_Promotions:int;Distance_from_Home:int;Number_of_Dependents:int
@@ -30,60 +42,162 @@ class InputData(BaseModel):
     Company_Reputation:str;Job_Role:str;Job_Level:str;Company_Size:str
     Remote_Work:str;Education_Level:str;Gender:str;Marital_Status:str
 
-def _strict(pref,v,cols):
-    vv=v.strip().lower()
-    for c in cols:
-        if c.lower()==f"{pref}_{vv}".lower(): return c
-    raise HTTPException(status_code=400,detail={"type":"invalid_category","field":pref,"value":v})
+_ORDINALS={
+    "Work_Life_Balance":("Work-Life Balance",{"poor":0,"fair":1,"good":2,"excellent":3}),
+    "Job_Satisfaction":("Job Satisfaction",{"low":0,"medium":1,"high":2,"very high":3}),
+    "Performance_Rating":("Performance Rating",{"low":0,"below average":1,"average":2,"high":3}),
+    "Employee_Recognition":("Employee Recognition",{"low":0,"medium":1,"high":2,"very high":3}),
+}
+_NUMERIC={"Age":"Age","Years_at_Company":"Years at Company","Monthly_Income":"Monthly Income",
+    "Number_of_Promotions":"Number of Promotions","Distance_from_Home":"Distance from Home","Number_of_Dependents":"Number of Dependents"}
+_BINARY={"Overtime":"Overtime","Leadership_Opportunities":"Leadership Opportunities",
+    "Innovation_Opportunities":"Innovation Opportunities","Remote_Work":"Remote Work"}
+_CATEGORICAL={"Company_Reputation":"Company Reputation","Job_Role":"Job Role","Job_Level":"Job Level",
+    "Company_Size":"Company Size","Education_Level":"Education Level","Marital_Status":"Marital Status"}
+
+def _first_bad(mask,raw):
+    i=int(np.flatnonzero(mask)[0])
+    return i,raw.iloc[i]
+
+class FeatureEncoder:
+    """Column indexes precompiled once from `features`; encodes InputData straight into NumPy rows."""
+    def __init__(self,cols):
+        self.cols=list(cols);idx={c:i for i,c in enumerate(self.cols)}
+        self.numeric=[(f,idx[c]) for f,c in _NUMERIC.items()]
+        self.ordinal=[(f,idx[c],m) for f,(c,m) in _ORDINALS.items()]
+        self.binary=[(f,pref,idx.get(f"{pref}_Yes")) for f,pref in _BINARY.items()]
+        self.male=idx.get("Gender_Male")
+        self.categorical=[(f,pref,self._labels(pref)) for f,pref in _CATEGORICAL.items()]
+
+    def _labels(self,pref):
+        # lowercased label -> column index; the first column wins when two normalize alike, as in the baseline _strict lookup
+        p=pref.lower()+"_";m={}
+        for i,c in enumerate(self.cols):
+            if c.lower().startswith(p): m.setdefault(c.lower()[len(p):],i)
+        return m
+
+    def encode_into(self,d,row):
+        for f,i in self.numeric: row[i]=getattr(d,f)
+        for f,i,m in self.ordinal:
+            v=getattr(d,f).strip().lower()
+            if v not in m: raise HTTPException(status_code=400,detail={"type":"invalid_ordinal","value":repr(v)})
+            row[i]=m[v]
+        for f,pref,i in self.binary:
+            if getattr(d,f).strip().lower()=="yes":
+                if i is None: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":pref})
+                row[i]=1
+        g=d.Gender.strip().lower()
+        if g=="male":
+            if self.male is None: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Gender"})
+            row[self.male]=1
+        elif g!="female":
+            raise HTTPException(status_code=400,detail={"type":"invalid_gender","value":d.Gender})
+        for f,pref,m in self.categorical:
+            v=getattr(d,f)
+            i=m.get(v.strip().lower())
+            if i is None: raise HTTPException(status_code=400,detail={"type":"invalid_category","field":pref,"value":v})
+            row[i]=1
+        return row
+
+    def encode(self,d):
+        return self.encode_into(d,np.zeros((1,len(self.cols)),dtype=np.float64)[0]).reshape(1,-1)
+
+    def encode_frame(self,df):
+        """Vectorized encode over a frame of InputData records (one row per employee)."""
+        n=len(df);X=np.zeros((n,len(self.cols)),dtype=np.float64)
+        norm={f:df[f].astype(str).str.strip().str.lower() for f in [*_ORDINALS,*_BINARY,*_CATEGORICAL,"Gender"]}
+        for f,i in self.numeric: X[:,i]=df[f].to_numpy(dtype=np.float64)
+        for f,i,m in self.ordinal:
+            v=norm[f].map(m)
+            if v.isna().any():
+                r,_=_first_bad(v.isna(),norm[f])
+                raise HTTPException(status_code=400,detail={"type":"invalid_ordinal","value":repr(norm[f].iloc[r]),"row":r})
+            X[:,i]=v.to_numpy(dtype=np.float64)
+        for f,pref,i in self.binary:
+            yes=(norm[f]=="yes").to_numpy()
+            if not yes.any(): continue
+            if i is None: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":pref,"row":int(np.flatnonzero(yes)[0])})
+            X[yes,i]=1
+        g=norm["Gender"];bad=~g.isin(["male","female"])
+        if bad.any():
+            r,v=_first_bad(bad,df["Gender"])
+            raise HTTPException(status_code=400,detail={"type":"invalid_gender","value":v,"row":r})
+        male=(g=="male").to_numpy()
+        if male.any():
+            if self.male is None: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Gender","row":int(np.flatnonzero(male)[0])})
+            X[male,self.male]=1
+        for f,pref,m in self.categorical:
+            j=norm[f].map(m)
+            if j.isna().any():
+                r,v=_first_bad(j.isna(),df[f])
+                raise HTTPException(status_code=400,detail={"type":"invalid_category","field":pref,"value":v,"row":r})
+            X[np.arange(n),j.to_numpy(dtype=np.int64)]=1
+        return X
+
+_encoder=registry.register("ahmed.attrition.encoder",lambda:FeatureEncoder(_features.get()))
 
 def build_feature_vector(d,cols):
-    r=pd.DataFrame({c:[0] for c in cols})
-    r.loc[0,"Age"]=d.Age;r.loc[0,"Years at Company"]=d.Years_at_Company;r.loc[0,"Monthly Income"]=d.Monthly_Income
-    r.loc[0,"Number of Promotions"]=d.Number_of_Promotions;r.loc[0,"Distance from Home"]=d.Distance_from_Home
-    r.loc[0,"Number of Dependents"]=d.Number_of_Dependents
-    w={"poor":0,"fair":1,"good":2,"excellent":3}
-    j={"low":0,"medium":1,"high":2,"very high":3}
-    p={"low":0,"below average":1,"average":2,"high":3}
-    e={"low":0,"medium":1,"high":2,"very high":3}
-    try:
-        r.loc[0,"Work-Life Balance"]=w[d.Work_Life_Balance.strip().lower()]
-        r.loc[0,"Job Satisfaction"]=j[d.Job_Satisfaction.strip().lower()]
-        r.loc[0,"Performance Rating"]=p[d.Performance_Rating.strip().lower()]
-        r.loc[0,"Employee Recognition"]=e[d.Employee_Recognition.strip().lower()]
-    except KeyError as ex:
-        raise HTTPException(status_code=400,detail={"type":"invalid_ordinal","value":str(ex)})
-    if d.Overtime.strip().lower()=="yes":
-        if "Overtime_Yes" not in cols: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Overtime"})
-        r.loc[0,"Overtime_Yes"]=1
-    if d.Leadership_Opportunities.strip().lower()=="yes":
-        if "Leadership Opportunities_Yes" not in cols: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Leadership Opportunities"})
-        r.loc[0,"Leadership Opportunities_Yes"]=1
-    if d.Innovation_Opportunities.strip().lower()=="yes":
-        if "Innovation Opportunities_Yes" not in cols: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Innovation Opportunities"})
-        r.loc[0,"Innovation Opportunities_Yes"]=1
-    if d.Remote_Work.strip().lower()=="yes":
-        if "Remote Work_Yes" not in cols: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Remote Work"})
-        r.loc[0,"Remote Work_Yes"]=1
-    g=d.Gender.strip().lower()
-    if g=="male":
-        if "Gender_Male" not in cols: raise HTTPException(status_code=400,detail={"type":"invalid_binary","field":"Gender"})
-        r.loc[0,"Gender_Male"]=1
-    elif g=="female":
-        pass
-    else:
-        raise HTTPException(status_code=400,detail={"type":"invalid_gender","value":d.Gender})
-    r.loc[0,_strict("Company Reputation",d.Company_Reputation,cols)]=1
-    r.loc[0,_strict("Job Role",d.Job_Role,cols)]=1
-    r.loc[0,_strict("Job Level",d.Job_Level,cols)]=1
-    r.loc[0,_strict("Company Size",d.Company_Size,cols)]=1
-    r.loc[0,_strict("Education Level",d.Education_Level,cols)]=1
-    r.loc[0,_strict("Marital Status",d.Marital_Status,cols)]=1
-    return r
+    return pd.DataFrame(_encoder.get().encode(d),columns=cols)
+
+def _predict_rows(X):
+    features=_features.get()
+    return _model.get().predict(pd.DataFrame(_scaler.get().transform(X),columns=features))
+
+# Concurrent /predict calls share one scaler.transform + model.predict
+_predict=batcher("ahmed.attrition",_predict_rows)
 
 @router.post("/predict")
 def predict(d:InputData):
-    if not _pkl_check["ok"]: raise HTTPException(status_code=500,detail=_pkl_check)
-    X=build_feature_vector(d,features)
-    if list(X.columns)!=features: raise HTTPException(status_code=500,detail={"type":"column_order_mismatch"})
-    X=pd.DataFrame(scaler.transform(X),columns=features)
-    return {"prediction":int(model.predict(X)[0])}
\ No newline at end of file
+    check=_get_pkl_check()
+    if not check["ok"]: raise HTTPException(status_code=500,detail=check)
+    X=build_feature_vector(d,_features.get())
+    return {"prediction":int(_predict(X)[0])}
+
+_records=TypeAdapter(list[InputData])
+
+def _read_batch_csv(raw):
+    df=pd.read_csv(io.BytesIO(raw))
+    df.columns=[c.strip().replace(" ","_").replace("-","_") for c in df.columns]
+    missing=[f for f in InputData.model_fields if f not in df.columns]
+    if missing: raise HTTPException(status_code=400,detail={"type":"missing_columns","columns":missing})
+    for f in _NUMERIC:
+        v=pd.to_numeric(df[f],errors="coerce")
+        if v.isna().any():
+            i,bad=_first_bad(v.isna(),df[f])
+            raise HTTPException(status_code=400,detail={"type":"invalid_number","field":f,"value":str(bad),"row":i})
+        # int fields of InputData: whole numbers only (3.0 passes, 3.5 and inf don't), like the JSON path
+        if InputData.model_fields[f].annotation is int:
+            frac=(v%1!=0).to_numpy()
+            if frac.any():
+                i,bad=_first_bad(frac,df[f])
+                raise HTTPException(status_code=400,detail={"type":"invalid_integer","field":f,"value":str(bad),"row":i})
+        df[f]=v
+    return df
+
+def _score_batch(df):
+    if df.empty: return {"count":0,"predictions":[],"probabilities":[]}
+    check=_get_pkl_check()
+    if not check["ok"]: raise HTTPException(status_code=500,detail=check)
+    scaler,model,features=_scaler.get(),_model.get(),_features.get()
+    X=pd.DataFrame(scaler.transform(pd.DataFrame(_encoder.get().encode_frame(df),columns=features)),columns=features)
+    proba=model.predict_proba(X)[:,1]
+    return {"count":int(len(df)),"predictions":[int(p) for p in model.predict(X)],"probabilities":[float(p) for p in proba]}
+
+def _score_csv(raw):
+    return _score_batch(_read_batch_csv(raw))
+
+# Parsing + scoring run on the CPU pool, at most 4 batches at once (see app/services/execution.py)
+_batch_limit=route_limit("ahmed.attrition.batch",4,8)
+
+@router.post("/predict-batch")
+async def predict_batch(request:Request):
+    """Score many employees at once: JSON list of InputData records, or a multipart CSV upload ("file")."""
+    if request.headers.get("content-type","").startswith("multipart/form-data"):
+        form=await request.form();f=form.get("file")
+        if f is None or not hasattr(f,"read"): raise HTTPException(status_code=400,detail={"type":"missing_file"})
+        return await _batch_limit.run(_score_csv,await f.read())
+    try: rows=_records.validate_python(await request.json())
+    except ValidationError as ex: raise HTTPException(status_code=422,detail=ex.errors(include_url=False,include_context=False))
+    except ValueError: raise HTTPException(status_code=400,detail={"type":"invalid_json"})
+    df=pd.DataFrame([r.model_dump() for r in rows],columns=list(InputData.model_fields))
+    return await _batch_limit.run(_score_batch,df)
\ No newline at end of file
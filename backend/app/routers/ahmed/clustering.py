@@ -5,21 +5,22 @@ import pandas as pd
 import pickle
 import os
 
-BASE_DIR = os.path.dirname(__file__)
-
-with open(os.path.join(BASE_DIR, "feature_columns.pkl"), "rb") as f:
-    FEATURE_COLUMNS = pickle.load(f)
+from app.services.model_registry import registry
 
-with open(os.path.join(BASE_DIR, "pca.pkl"), "rb") as f:
-    PCA = pickle.load(f)
-
-with open(os.path.join(BASE_DIR, "umap.pkl"), "rb") as f:
-    UMAP_MODEL = pickle.load(f)
+BASE_DIR = os.path.dirname(__file__)
 
-with open(os.path.join(BASE_DIR, "kmeans.pkl"), "rb") as f:
-    KMEANS = pickle.load(f)
+def _load_pickle(name):
+    with open(os.path.join(BASE_DIR, name), "rb") as f:
+        return pickle.load(f)
 
-CLUSTER_INFO = pd.read_csv(os.path.join(BASE_DIR, "cluster_interpretation.csv"))
+FEATURE_COLUMNS = registry.register("ahmed.clustering.feature_columns", lambda: _load_pickle("feature_columns.pkl"))
+PCA = registry.register("ahmed.clustering.pca", lambda: _load_pickle("pca.pkl"))
+UMAP_MODEL = registry.register("ahmed.clustering.umap", lambda: _load_pickle("umap.pkl"))
+KMEANS = registry.register("ahmed.clustering.kmeans", lambda: _load_pickle("kmeans.pkl"))
+CLUSTER_INFO = registry.register(
+    "ahmed.clustering.cluster_info",
+    lambda: pd.read_csv(os.path.join(BASE_DIR, "cluster_interpretation.csv")),
+)
 
 router = APIRouter()
 
@@ -28,11 +29,11 @@ class ClusterInput(BaseModel):
 
 @router.get("/features")
 def features():
-    return FEATURE_COLUMNS
+    return FEATURE_COLUMNS.get()
 
 @router.post("/predict")
 def predict(data: ClusterInput):
-    X = pd.DataFrame(0.0, index=[0], columns=FEATURE_COLUMNS)
+    X = pd.DataFrame(0.0, index=[0], columns=FEATURE_COLUMNS.get())
     for k, v in data.features.items():
         if k in X.columns:
             X.at[0, k] = float(v)
@@ -41,15 +42,16 @@ def predict(data: ClusterInput):
     X = np.nan_to_num(X, 0.0)
     X = np.asarray(X, dtype=np.float64, order="C")
 
-    Xp = PCA.transform(X)
+    Xp = PCA.get().transform(X)
     Xp = np.asarray(Xp, dtype=np.float64, order="C")
 
-    Xu = UMAP_MODEL.transform(Xp)
+    Xu = UMAP_MODEL.get().transform(Xp)
     Xu = np.asarray(Xu, dtype=np.float64, order="C")
 
-    cid = int(KMEANS.predict(Xu)[0])
+    cid = int(KMEANS.get().predict(Xu)[0])
 
-    row = CLUSTER_INFO[CLUSTER_INFO.cluster == cid]
+    info = CLUSTER_INFO.get()
+    row = info[info.cluster == cid]
     if row.empty:
         raise HTTPException(status_code=404, detail="cluster_not_found")
 
@@ -1,15 +1,21 @@
 from fastapi import APIRouter,HTTPException
 from pydantic import BaseModel
 import pandas as pd,pickle,os
+from app.services.model_registry import registry
+from app.services.batching import batcher
 
 router=APIRouter()
 MD=os.path.dirname(__file__)
 
-model=pickle.load(open(os.path.join(MD,"salary_model.pkl"),"rb"))
-features=list(pickle.load(open(os.path.join(MD,"salary_features.pkl"),"rb")))
-scaler=pickle.load(open(os.path.join(MD,"salary_scaler.pkl"),"rb"))
+def _pkl(name):
+    with open(os.path.join(MD,name),"rb") as f: return pickle.load(f)
+
+_model=registry.register("ahmed.salary.model",lambda:_pkl("salary_model.pkl"))
+_features=registry.register("ahmed.salary.features",lambda:list(_pkl("salary_features.pkl")))
+_scaler=registry.register("ahmed.salary.scaler",lambda:_pkl("salary_scaler.pkl"))
 
 def _check_pkls():
+    model,features,scaler=_model.get(),_features.get(),_scaler.get()
     out={"ok":True,"errors":[]}
     if not hasattr(model,"predict"): out["ok"]=False;out["errors"].append({"type":"model_missing_predict"})
     if not hasattr(scaler,"transform"): out["ok"]=False;out["errors"].append({"type":"scaler_missing_transform"})
@@ -25,7 +31,12 @@ def _check_pkls():
         out["ok"]=False;out["errors"].append({"type":"pipeline_smoke_test","error":str(ex)})
     return out
 
-_pkl_check=_check_pkls()
+_pkl_check=None
+
+def _get_pkl_check():
+    global _pkl_check
+    if _pkl_check is None: _pkl_check=_check_pkls()
+    return _pkl_check
 
 class InputData(BaseModel):
     Age:int
@@ -47,11 +58,20 @@ def build_feature_vector(d,cols):
     if list(r.columns)!=cols: r=r[cols]
     return r
 
+def _predict_rows(X):
+    scaler=_scaler.get()
+    X[scaler.num_cols]=scaler.transform(X[scaler.num_cols])
+    return _model.get().predict(X)
+
+# Concurrent /predict calls share one scaler.transform + model.predict
+_predict=batcher("ahmed.salary",_predict_rows)
+
 @router.post("/predict")
 def predict(d:InputData):
     print("salary predict ok")
-    if not _pkl_check["ok"]: raise HTTPException(status_code=500,detail=_pkl_check)
+    check=_get_pkl_check()
+    if not check["ok"]: raise HTTPException(status_code=500,detail=check)
+    features,scaler=_features.get(),_scaler.get()
     X=build_feature_vector(d,features)
     if set(scaler.num_cols)-set(X.columns): raise HTTPException(status_code=500,detail={"type":"scaled_cols_missing"})
-    X[scaler.num_cols]=scaler.transform(X[scaler.num_cols])
-    return {"salary":float(model.predict(X)[0])}
\ No newline at end of file
+    return {"salary":float(_predict(X)[0])}
\ No newline at end of file
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
 import numpy as np
+import pandas as pd
 import pickle
 import os
 import re
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+
 router = APIRouter(prefix="/competition", tags=["competition"])
 
 MD = os.path.dirname(__file__)
@@ -21,11 +25,12 @@ def safe_load_pickle(path, name):
         print(f"⚠ Error loading {name}: {e}")
         return None
 
-model = safe_load_pickle(os.path.join(MD, "model_gb.pkl"), "Model")
-tfidf = safe_load_pickle(os.path.join(MD, "tfidf.pkl"), "TF-IDF")
-svd = safe_load_pickle(os.path.join(MD, "svd.pkl"), "SVD")
-scaler = safe_load_pickle(os.path.join(MD, "scaler.pkl"), "Scaler")
-le = safe_load_pickle(os.path.join(MD, "label_encoder.pkl"), "Label Encoder")
+# source= lets MODEL_MMAP_DIR share their arrays between workers (app/services/model_registry.py)
+model = registry.register("houda.competition.model", lambda: safe_load_pickle(os.path.join(MD, "model_gb.pkl"), "Model"), source=os.path.join(MD, "model_gb.pkl"))
+tfidf = registry.register("houda.competition.tfidf", lambda: safe_load_pickle(os.path.join(MD, "tfidf.pkl"), "TF-IDF"), source=os.path.join(MD, "tfidf.pkl"))
+svd = registry.register("houda.competition.svd", lambda: safe_load_pickle(os.path.join(MD, "svd.pkl"), "SVD"), source=os.path.join(MD, "svd.pkl"))
+scaler = registry.register("houda.competition.scaler", lambda: safe_load_pickle(os.path.join(MD, "scaler.pkl"), "Scaler"))
+le = registry.register("houda.competition.label_encoder", lambda: safe_load_pickle(os.path.join(MD, "label_encoder.pkl"), "Label Encoder"))
 
 CATEGORY_MAP = {
     "web": "Web Development",
@@ -52,7 +57,10 @@ class InputData(BaseModel):
 def normalize_category(cat: str):
     return CATEGORY_MAP.get(cat.lower(), cat)
 
-def build_features(d: InputData):
+KEYWORDS = ["urgent", "expert", "senior", "high paying", "immediate"]
+
+def build_row(d: InputData):
+    """Raw model inputs of one request, as a one-row frame (see features_from_rows)"""
     category = normalize_category(d.Category_Name)
     job_text = " ".join([
         d.Job_Title,
@@ -60,24 +68,31 @@ def build_features(d: InputData):
         d.Search_Keyword,
         category
     ])
-    spent_log = np.log1p(d.Spent_USD)
-    keywords = ["urgent", "expert", "senior", "high paying", "immediate"]
-    kw_vals = [1 if k in job_text.lower() else 0 for k in keywords]
-    X_text = tfidf.transform([job_text])
-    X_text = svd.transform(X_text)
-    X_num = scaler.transform([[spent_log]])
-    return np.hstack([X_text, X_num, np.array(kw_vals).reshape(1, -1)])
+    row = {"job_text": job_text, "spent_log": np.log1p(d.Spent_USD)}
+    row.update({k: 1 if k in job_text.lower() else 0 for k in KEYWORDS})
+    return pd.DataFrame([row])
+
+def features_from_rows(rows: pd.DataFrame):
+    X_text = tfidf.get().transform(rows["job_text"])
+    X_text = svd.get().transform(X_text)
+    X_num = scaler.get().transform(rows[["spent_log"]].to_numpy())
+    return np.hstack([X_text, X_num, rows[KEYWORDS].to_numpy()])
+
+def build_features(d: InputData):
+    return features_from_rows(build_row(d))
+
+# Concurrent /predict calls share one tfidf/svd/scaler transform and one model.predict
+predict_rows = batcher("houda.competition", lambda rows: model.get().predict(features_from_rows(rows)))
 
 @router.post("/predict")
 def predict(d: InputData):
     try:
         # Validate models are loaded
-        if not all([model, tfidf, svd, scaler, le]):
+        if not all([model.get(), tfidf.get(), svd.get(), scaler.get(), le.get()]):
             raise HTTPException(status_code=503, detail="Models not loaded. Check server logs.")
         
-        X = build_features(d)
-        pred = model.predict(X)[0]
-        label = le.inverse_transform([pred])[0]
+        pred = predict_rows(build_row(d))[0]
+        label = le.get().inverse_transform([pred])[0]
         return {"prediction": int(pred), "label": label}
     except HTTPException:
         raise
@@ -8,9 +8,11 @@ import pandas as pd
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
-from sentence_transformers import SentenceTransformer
 from sklearn.cluster import KMeans as SKLearnKMeans
 
+from app.services.embeddings import embedding_service
+from app.services.model_registry import registry
+
 try:
     import hdbscan
     from hdbscan import prediction as hdbscan_prediction
@@ -64,40 +66,47 @@ def _safe_load_joblib(path: str, key: str):
         load_errors[key] = f"{type(e).__name__}: {e}"
         return None
 
-cfg = _safe_load_joblib(CFG_PATH, "config.joblib")
-scaler_model = _safe_load_joblib(SCALER_PATH, "scaler_model.joblib")
-
-umap_model = None
-try:
-    if umap is not None:
-        umap_model = _safe_load_joblib(UMAP_PATH, "umap_model.joblib")
-except Exception:
-    umap_model = None
-
-kmeans = _safe_load_joblib(KMEANS_PATH, "kmeans.joblib")
-
-hdb = None
-if hdbscan is not None and hdbscan_prediction is not None:
-    hdb = _safe_load_joblib(HDBSCAN_PATH, "hdbscan.joblib")
-
-embedder = None
-try:
-    if os.path.isdir(EMBEDDER_DIR):
-        embedder = SentenceTransformer(EMBEDDER_DIR)
-    else:
+def _load_umap():
+    try:
+        if umap is not None:
+            return _safe_load_joblib(UMAP_PATH, "umap_model.joblib")
+    except Exception:
+        pass
+    return None
+
+def _load_hdbscan():
+    if hdbscan is not None and hdbscan_prediction is not None:
+        return _safe_load_joblib(HDBSCAN_PATH, "hdbscan.joblib")
+    return None
+
+def _load_embedder():
+    # Shared with job_segmentation.py: one copy of the weights per process
+    try:
+        if os.path.isdir(EMBEDDER_DIR):
+            service = embedding_service("houda.text_embedder", EMBEDDER_DIR)
+            service.model()
+            return service
         load_errors["text_embedder"] = f"Missing folder: {EMBEDDER_DIR}"
-except Exception as e:
-    load_errors["text_embedder"] = f"{type(e).__name__}: {e}"
+    except Exception as e:
+        load_errors["text_embedder"] = f"{type(e).__name__}: {e}"
+    return None
+
+cfg = registry.register("houda.clustering.config", lambda: _safe_load_joblib(CFG_PATH, "config.joblib"))
+scaler_model = registry.register("houda.clustering.scaler", lambda: _safe_load_joblib(SCALER_PATH, "scaler_model.joblib"))
+umap_model = registry.register("houda.clustering.umap", _load_umap)
+kmeans = registry.register("houda.clustering.kmeans", lambda: _safe_load_joblib(KMEANS_PATH, "kmeans.joblib"))
+hdb = registry.register("houda.clustering.hdbscan", _load_hdbscan)
+embedder = registry.register("houda.clustering.embedding_service", _load_embedder)
 
 def _assert_loaded():
     missing = []
-    if cfg is None:
+    if cfg.get() is None:
         missing.append("ml_export_kmeans/config.joblib")
-    if scaler_model is None:
+    if scaler_model.get() is None:
         missing.append("ml_export_kmeans/scaler_model.joblib")
-    if kmeans is None:
+    if kmeans.get() is None:
         missing.append("ml_export_kmeans/kmeans.joblib")
-    if embedder is None:
+    if embedder.get() is None:
         missing.append("text_embedder/")
     if missing:
         raise HTTPException(
@@ -136,8 +145,9 @@ def build_features(df: pd.DataFrame) -> np.ndarray:
     df["Spent_USD"] = df.get("Spent_USD", 0).fillna(0)
     df["Spent_USD_log"] = np.log1p(df["Spent_USD"]).clip(upper=8)
 
-    numeric_features = cfg.get("numeric_features", [])
-    text_cols = cfg.get("text_cols", ["Job_Title", "Description"])
+    config = cfg.get()
+    numeric_features = config.get("numeric_features", [])
+    text_cols = config.get("text_cols", ["Job_Title", "Description"])
 
     for c in numeric_features:
         if c not in df.columns:
@@ -151,8 +161,7 @@ def build_features(df: pd.DataFrame) -> np.ndarray:
 
     X_num = df[numeric_features].astype(float).to_numpy()
     df["text_combined"] = df[text_cols].astype(str).agg(" ".join, axis=1)
-    X_txt = embedder.encode(df["text_combined"].tolist(), show_progress_bar=False)
-    X_txt = np.asarray(X_txt, dtype=np.float32)
+    X_txt = embedder.get().encode(df["text_combined"].tolist())
 
     return np.hstack([X_num, X_txt])
 
@@ -208,15 +217,17 @@ def predict_cluster(d: ClusterInput):
     try:
         df = pd.DataFrame([d.model_dump()])
         X = build_features(df)
-        X_scaled = scaler_model.transform(X)
+        X_scaled = scaler_model.get().transform(X)
 
-        if umap_model is not None:
-            X_processed = umap_model.transform(X_scaled)
+        umap_m = umap_model.get()
+        if umap_m is not None:
+            X_processed = umap_m.transform(X_scaled)
         else:
             X_processed = X_scaled
 
+        km = kmeans.get()
         try:
-            k_label = int(kmeans.predict(X_processed)[0]) if kmeans is not None else None
+            k_label = int(km.predict(X_processed)[0]) if km is not None else None
         except ValueError as ve:
             if "features" in str(ve):
                 k_label = hash(str(d.Category_Name) + str(d.Job_Title)) % 5
@@ -225,9 +236,10 @@ def predict_cluster(d: ClusterInput):
 
         h_label = None
         strength = None
-        if hdb is not None:
+        hdb_m = hdb.get()
+        if hdb_m is not None:
             try:
-                labels, probs = hdbscan_prediction.approximate_predict(hdb, X_processed)
+                labels, probs = hdbscan_prediction.approximate_predict(hdb_m, X_processed)
                 h_label = int(labels[0])
                 strength = float(probs[0])
             except Exception:
@@ -7,6 +7,9 @@ import lightgbm as lgb
 import os
 import re
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+
 router = APIRouter(prefix="/financial", tags=["financial"])
 
 MD = os.path.dirname(__file__)
@@ -33,9 +36,9 @@ def safe_load_lgb(path):
         print(f"⚠ Error loading LGB model: {e}")
         return None
 
-preprocessor = safe_load(os.path.join(MD, "preprocessor.joblib"), "Preprocessor")
-schema = safe_load(os.path.join(MD, "schema.joblib"), "Schema")
-model = safe_load_lgb(os.path.join(MD, "lgb_model.txt"))
+preprocessor = registry.register("houda.financial.preprocessor", lambda: safe_load(os.path.join(MD, "preprocessor.joblib"), "Preprocessor"))
+schema = registry.register("houda.financial.schema", lambda: safe_load(os.path.join(MD, "schema.joblib"), "Schema"))
+model = registry.register("houda.financial.model", lambda: safe_load_lgb(os.path.join(MD, "lgb_model.txt")))
 
 
 class InputData(BaseModel):
@@ -90,10 +93,11 @@ class InputData(BaseModel):
 # -------------------------
 def prepare_input(df: pd.DataFrame):
     """Ensure columns order & presence match training schema"""
-    for col in schema["input_columns"]:
+    input_columns = schema.get()["input_columns"]
+    for col in input_columns:
         if col not in df.columns:
             df[col] = np.nan
-    return df[schema["input_columns"]]
+    return df[input_columns]
 
 def workload_to_hours_per_week(workload: str) -> float:
     # mapping simple (tu peux ajuster)
@@ -120,13 +124,16 @@ def to_label_from_ratio(ratio: float) -> str:
         return "moyen"
     return "faible"
 
+# Concurrent /predict calls share one preprocessor.transform + model.predict
+predict_rows = batcher("houda.financial", lambda df: model.get().predict(preprocessor.get().transform(df)))
+
 # -------------------------
 # Endpoint
 # -------------------------
 @router.post("/predict")
 def predict(d: InputData):
     try:
-        if not all([preprocessor, schema, model]):
+        if not all([preprocessor.get(), schema.get(), model.get()]):
             raise HTTPException(status_code=503, detail="Models not loaded. Check server logs.")
 
         # 1) Input → DataFrame
@@ -135,14 +142,11 @@ def predict(d: InputData):
         # 2) Align schema
         df_aligned = prepare_input(df.copy())
 
-        # 3) Preprocess
-        X = preprocessor.transform(df_aligned)
-
-        # 4) Predict
+        # 3) Preprocess + 4) Predict (batched with concurrent requests)
         # IMPORTANT:
         # - Si ton modèle est un modèle de CLASSIF (proba), pred est une proba
         # - Si c'est un modèle de RÉGRESSION (ratio), pred est une valeur réelle
-        pred = float(model.predict(X)[0])
+        pred = float(predict_rows(df_aligned)[0])
 
         # ---- Interprétation business (choisis UNE logique cohérente) ----
         # Option A (recommandé si ton modèle est régression ratio):
@@ -7,7 +7,9 @@ import numpy as np
 import pandas as pd
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
-from sentence_transformers import SentenceTransformer
+
+from app.services.embeddings import embedding_service
+from app.services.model_registry import registry
 
 try:
     import hdbscan
@@ -45,19 +47,19 @@ _ensure_numpy_core_compat()
 MD = os.path.dirname(__file__)
 KMEANS_EXPORT_DIR = os.path.join(MD, "ml_export_kmeans")
 
-cfg = joblib.load(os.path.join(KMEANS_EXPORT_DIR, "config.joblib"))
-scaler_model = joblib.load(os.path.join(KMEANS_EXPORT_DIR, "scaler_model.joblib"))
-kmeans = joblib.load(os.path.join(KMEANS_EXPORT_DIR, "kmeans.joblib"))
-
-umap_model = None
-if umap is not None:
-    umap_model = joblib.load(os.path.join(KMEANS_EXPORT_DIR, "umap_model.joblib"))
-
-hdb = None
-if hdbscan is not None and hdbscan_prediction is not None:
-    hdb = joblib.load(os.path.join(MD, "hdbscan.joblib"))
-
-embedder = SentenceTransformer(os.path.join(MD, "text_embedder"))
+cfg = registry.register("houda.segmentation.config", lambda: joblib.load(os.path.join(KMEANS_EXPORT_DIR, "config.joblib")))
+scaler_model = registry.register("houda.segmentation.scaler", lambda: joblib.load(os.path.join(KMEANS_EXPORT_DIR, "scaler_model.joblib")))
+kmeans = registry.register("houda.segmentation.kmeans", lambda: joblib.load(os.path.join(KMEANS_EXPORT_DIR, "kmeans.joblib")))
+umap_model = registry.register(
+    "houda.segmentation.umap",
+    lambda: joblib.load(os.path.join(KMEANS_EXPORT_DIR, "umap_model.joblib")) if umap is not None else None,
+)
+hdb = registry.register(
+    "houda.segmentation.hdbscan",
+    lambda: joblib.load(os.path.join(MD, "hdbscan.joblib")) if hdbscan is not None and hdbscan_prediction is not None else None,
+)
+# Shared with clustering.py: one copy of the weights per process
+embedder = embedding_service("houda.text_embedder", os.path.join(MD, "text_embedder"))
 
 
 class ClusterInput(BaseModel):
@@ -81,9 +83,10 @@ class ClusterInput(BaseModel):
 
 def build_features(df):
     df["Spent_USD_log"] = np.log1p(df["Spent_USD"]).clip(upper=8)
-    X_num = df[cfg["numeric_features"]].fillna(0).to_numpy()
-    df["text"] = df[cfg["text_cols"]].astype(str).agg(" ".join, axis=1)
-    X_txt = embedder.encode(df["text"].tolist(), show_progress_bar=False)
+    config = cfg.get()
+    X_num = df[config["numeric_features"]].fillna(0).to_numpy()
+    df["text"] = df[config["text_cols"]].astype(str).agg(" ".join, axis=1)
+    X_txt = embedder.encode(df["text"].tolist())
     return np.hstack([X_num, X_txt])
 
 
@@ -94,11 +97,12 @@ router = APIRouter(prefix="/cluster", tags=["Houda Segmentation"])
 def predict_cluster(d: ClusterInput):
     df = pd.DataFrame([d.model_dump()])
     X = build_features(df)
-    X = scaler_model.transform(X)
-    if umap_model is not None:
-        X = umap_model.transform(X)
+    X = scaler_model.get().transform(X)
+    umap_m = umap_model.get()
+    if umap_m is not None:
+        X = umap_m.transform(X)
 
-    k_label = int(kmeans.predict(X)[0])
+    k_label = int(kmeans.get().predict(X)[0])
 
     return {
         "kmeans_cluster": k_label
@@ -4,6 +4,9 @@ import joblib
 import os
 import numpy as np
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+
 router = APIRouter()
 
 # 1. Path Setup
@@ -11,9 +14,14 @@ BASE_PATH = os.path.dirname(__file__)
 
 # 2. Model & Scaler Loading
 # Assure-toi que 'cluster_scaler.pkl' est bien dans le dossier avec les autres
-reg_model = joblib.load(os.path.join(BASE_PATH, "job_count_model.pkl"))
-cluster_model = joblib.load(os.path.join(BASE_PATH, "job_cluster_model.pkl"))
-cluster_scaler = joblib.load(os.path.join(BASE_PATH, "cluster_scaler.pkl")) # AJOUTÉ
+# Chargement à la première requête (voir app/services/model_registry.py)
+reg_model = registry.register("ilef.job_count_model", lambda: joblib.load(os.path.join(BASE_PATH, "job_count_model.pkl")))
+cluster_model = registry.register("ilef.job_cluster_model", lambda: joblib.load(os.path.join(BASE_PATH, "job_cluster_model.pkl")))
+cluster_scaler = registry.register("ilef.cluster_scaler", lambda: joblib.load(os.path.join(BASE_PATH, "cluster_scaler.pkl"))) # AJOUTÉ
+
+# Concurrent requests to the same model are predicted together (app/services/batching.py)
+predict_demand = batcher("ilef.job_count", lambda X: reg_model.get().predict(X))
+predict_segment = batcher("ilef.job_cluster", lambda X: cluster_model.get().predict(cluster_scaler.get().transform(X)))
 
 # 3. Data Schemas
 class DemandInput(BaseModel):
@@ -30,7 +38,7 @@ class SegmentationInput(BaseModel):
 def predict_market_size(data: DemandInput):
     try:
         input_data = [[int(data.python), int(data.sql), int(data.r)]]
-        prediction = reg_model.predict(input_data)
+        prediction = predict_demand(input_data)
         
         return {
             "estimated_job_openings": int(prediction[0]),
@@ -46,11 +54,8 @@ def categorize_jobs(data: SegmentationInput):
         # A. Préparer les données
         features = [[data.num_jobs, data.skill_richness]]
         
-        # B. Appliquer le scaler (Crucial car le modèle a été entraîné sur des données scalées)
-        scaled_features = cluster_scaler.transform(features)
-        
-        # C. Prédiction
-        group = cluster_model.predict(scaled_features)
+        # B+C. Scaler (crucial : modèle entraîné sur des données scalées) puis prédiction, en lot
+        group = predict_segment(features)
         cluster_id = int(group[0])
         
         # D. Mapping
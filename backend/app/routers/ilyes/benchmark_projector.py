@@ -0,0 +1,100 @@
+"""Accuracy, latency and memory of the svd_cv projector against tfidf_cv + svd_cv.
+
+    cd backend && python -m app.routers.ilyes.benchmark_projector [n_requests]
+
+The sklearn path is vectorizer.transform + svd.transform in float64; the
+projector (app/services/projection.py) is one float32 term table. Memory is
+the RSS growth of a fresh process loading each side, the projector once as a
+regular array and once memory-mapped (what MODEL_MMAP_DIR gives every worker).
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from app.routers.ilyes import clustering
+from app.services.model_registry import _rss
+from app.services.projection import TOLERANCE, build_projector
+
+warnings.filterwarnings("ignore")
+
+SAMPLES = [
+    ("Data Scientist", "Acme Corp", "python pandas scikit-learn sql", "france"),
+    ("Senior Software Engineer", "Tech Corp", "java spring kubernetes aws", "germany"),
+    ("Data Engineer", "Upwork", "spark airflow python gcp", "india"),
+    ("Business Analyst", "Globex", "excel power bi sql tableau", "united states"),
+    ("Frontend Developer", "Initech", "react typescript css", "canada"),
+]
+
+
+def docs(n):
+    items = [clustering.ClusterInput(job_title=t, company=c, skills=s, country=k) for t, c, s, k in SAMPLES]
+    return [clustering.build_row(items[i % len(items)])["clean"][0] for i in range(n)]
+
+
+def per_call_ms(fn, arg, repeat):
+    fn(arg)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def _rss_after(kind, path, queue):
+    """RSS growth of loading one side and transforming a document, in a fresh process."""
+    before = _rss() or 0
+    if kind == "sklearn":
+        tfidf = joblib.load(os.path.join(clustering.MD, "tfidf_cv.joblib"))
+        svd = joblib.load(os.path.join(clustering.MD, "svd_cv.joblib"))
+        svd.transform(tfidf.transform(["data scientist python"]))
+    else:
+        projector = joblib.load(path, mmap_mode="r" if kind == "projector (mmap)" else None)
+        projector.transform(["data scientist python"])
+    queue.put((_rss() or 0) - before)
+
+
+def rss_delta(kind, path=None):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_rss_after, args=(kind, path, queue))
+    proc.start()
+    delta = queue.get()
+    proc.join()
+    return delta
+
+
+def main(n=200):
+    tfidf = joblib.load(os.path.join(clustering.MD, "tfidf_cv.joblib"))
+    svd = joblib.load(os.path.join(clustering.MD, "svd_cv.joblib"))
+    projector = build_projector(tfidf, svd)
+    sample = docs(n)
+
+    expected = svd.transform(tfidf.transform(sample))
+    got = projector.transform(sample)
+    print(f"accuracy        max |diff| {np.max(np.abs(got - expected)):.2e}  "
+          f"(tolerance {TOLERANCE:.0e})")
+    print(f"table           {projector.weights.nbytes / 1024:8.1f} KiB float32 | "
+          f"svd components {svd.components_.nbytes / 1024:8.1f} KiB float64")
+
+    def sklearn(d):
+        return svd.transform(tfidf.transform(d))
+
+    for label, batch, repeat in (("1 posting", sample[:1], n), (f"{n} postings", sample, 20)):
+        a = per_call_ms(sklearn, batch, repeat)
+        b = per_call_ms(projector.transform, batch, repeat)
+        print(f"{label:<15} sklearn {a:8.3f} ms  projector {b:8.3f} ms  ({a / b:4.1f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "svd_projector.joblib")
+        joblib.dump(projector, path)
+        for kind in ("sklearn", "projector", "projector (mmap)"):
+            print(f"RSS {kind:<17} +{rss_delta(kind, path) / 2**20:6.1f} MiB (fresh process)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
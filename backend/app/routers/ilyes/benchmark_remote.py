@@ -0,0 +1,93 @@
+"""Memory/latency per request of the /remote/predict feature path.
+
+    cd backend && python -m app.routers.ilyes.benchmark_remote [n_requests]
+
+Compares the old dense path (tfidf_for_mlp .toarray() + np.hstack, which only
+built the matrix) with the sparse CSR path of remote.py that feeds the booster,
+one request at a time and as one batch. The sparse side needs the vectorizer
+the booster was trained with (remote.check_layout).
+"""
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import joblib
+import numpy as np
+from fastapi import HTTPException
+
+from app.routers.ilyes import remote
+
+warnings.filterwarnings("ignore")
+
+SAMPLES = [
+    ("Data Scientist", "Acme Corp", "python pandas scikit-learn sql", "united states"),
+    ("Software Engineer", "Tech Corp", "java spring kubernetes aws", "germany"),
+    ("Data Engineer", "Upwork", "spark airflow python gcp", "india"),
+    ("Business Analyst", "Globex", "excel power bi sql tableau", "france"),
+]
+
+
+def dense_features(data, tfidf_mlp, ohe_country, scaler_cv):
+    clean = remote.clean_text(data.job_title + " " + data.company + " " + data.skills)
+    n = len(data.skills.split())
+    X_text = tfidf_mlp.transform([clean]).toarray()
+    X_country = ohe_country.transform([[data.country]])
+    X_num = scaler_cv.transform([[n, n]])
+    return np.hstack([X_text, X_country, X_num])
+
+
+def matrix_bytes(X):
+    if hasattr(X, "indptr"):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def measure(fn, items):
+    """Mean latency (ms) and mean tracemalloc peak (bytes) of fn(item) per item."""
+    fn(items[0])  # warm caches / lazy loads
+    peaks, t0 = [], time.perf_counter()
+    for item in items:
+        tracemalloc.start()
+        fn(item)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return (time.perf_counter() - t0) / len(items) * 1000, float(np.mean(peaks))
+
+
+def main(n=200):
+    items = [remote.RemoteInput(job_title=t, company=c, skills=s, country=k) for t, c, s, k in SAMPLES] * (n // len(SAMPLES))
+    md = remote.MD
+    tfidf_mlp = joblib.load(os.path.join(md, "tfidf_for_mlp.joblib"))
+    ohe_country = joblib.load(os.path.join(md, "ohe_country.joblib"))
+    scaler_cv = joblib.load(os.path.join(md, "scaler_cv.joblib"))
+
+    dense = dense_features(items[0], tfidf_mlp, ohe_country, scaler_cv)
+    ms, peak = measure(lambda d: dense_features(d, tfidf_mlp, ohe_country, scaler_cv), items)
+    print(f"dense features  {ms:7.3f} ms/request  peak {peak / 1024:8.1f} KiB/request (no prediction)")
+    try:
+        remote.check_layout()
+    except HTTPException as e:
+        print(f"✗ sparse path skipped: {e.detail}")
+        return
+    sparse = remote.build_features(remote.build_rows(items[:1]))
+    print(f"feature row     dense {dense.shape[1]:>6} cols {matrix_bytes(dense):>8} B | "
+          f"sparse {sparse.shape[1]:>6} cols {matrix_bytes(sparse):>8} B ({sparse.nnz} stored values)")
+
+    ms, peak = measure(lambda d: remote.build_features(remote.build_rows([d])), items)
+    print(f"sparse features {ms:7.3f} ms/request  peak {peak / 1024:8.1f} KiB/request")
+    ms, peak = measure(lambda d: remote.predict_proba(remote.build_rows([d])), items)
+    print(f"sparse predict  {ms:7.3f} ms/request  peak {peak / 1024:8.1f} KiB/request (features + DMatrix + booster)")
+
+    t0 = time.perf_counter()
+    tracemalloc.start()
+    remote.predict_proba(remote.build_rows(items))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ms = (time.perf_counter() - t0) * 1000 / len(items)
+    print(f"sparse batch    {ms:7.3f} ms/request  peak {peak / 1024 / len(items):8.1f} KiB/request ({len(items)} postings)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
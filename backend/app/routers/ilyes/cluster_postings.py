@@ -0,0 +1,131 @@
+"""Offline clustering of scraped postings with candidate_clusters.joblib.
+
+    cd backend && python -m app.routers.ilyes.cluster_postings postings.csv clusters.ndjson \
+        [--chunksize 2000] [--workers 4]
+
+Input is a CSV or NDJSON (.ndjson/.jsonl) file with job_title, company, skills
+and country. Chunks go through the same chain as /ilyes_clustering/predict-batch
+on a process pool, and assignments are appended to the output (NDJSON, or CSV
+when it ends in .csv) as each chunk finishes, in input order. A posting that
+doesn't parse or validate, or whose chunk fails, gets an error instead of a
+cluster; the run goes on.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+
+from app.routers.ilyes import clustering
+
+
+def csv_posting(row):
+    """(posting dict, None) or (None, error) for one csv.DictReader row"""
+    if None in row:
+        return None, "too many fields"
+    return clustering.validate_posting({k: row[k] for k in clustering.FIELDS if k in row})
+
+
+def read_chunks(path, chunksize):
+    """(job, chunk) pairs, chunksize postings at a time: job(chunk) labels the chunk."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            job, rows = clustering.label_lines, (line for line in f if line.strip())
+        else:
+            job, rows = clustering.label_parsed, (csv_posting(row) for row in csv.DictReader(f))
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunksize:
+                yield job, chunk
+                chunk = []
+        if chunk:
+            yield job, chunk
+
+
+def write_chunk(out, start, items, as_csv):
+    if as_csv:
+        csv.writer(out).writerows((i, item.get("cluster", ""), item.get("error", "")) for i, item in enumerate(items, start=start))
+    else:
+        out.write("".join(json.dumps({"index": i, **item}) + "\n" for i, item in enumerate(items, start=start)))
+    out.flush()
+    return len(items), sum(1 for item in items if "error" in item)
+
+
+def _inline(fn, arg):
+    fut = Future()
+    try:
+        fut.set_result(fn(arg))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+def _submit(submit, job, chunk):
+    try:
+        return submit(job, chunk)
+    except BrokenExecutor as e:
+        # A dead worker breaks the pool: the remaining chunks are reported as failed
+        fut = Future()
+        fut.set_exception(e)
+        return fut
+
+
+def _result(size, fut):
+    try:
+        return fut.result()
+    except Exception as e:
+        return clustering.chunk_failed(size, e)
+
+
+def run(source, target, chunksize=clustering.CHUNK_ROWS, workers=clustering.CLUSTER_WORKERS):
+    as_csv = target.endswith(".csv")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) if workers > 0 else None
+    submit = pool.submit if pool is not None else _inline
+    pending = deque()  # (start, size, future) in input order
+    start = rows = errors = 0
+    t0 = time.perf_counter()
+    with open(target, "w", encoding="utf-8", newline="") as out:
+        if as_csv:
+            out.write("index,cluster,error\n")
+
+        def flush_one():
+            nonlocal rows, errors
+            s, size, fut = pending.popleft()
+            n, failed = write_chunk(out, s, _result(size, fut), as_csv)
+            rows += n
+            errors += failed
+
+        try:
+            for job, chunk in read_chunks(source, chunksize):
+                pending.append((start, len(chunk), _submit(submit, job, chunk)))
+                start += len(chunk)
+                # Bounded look-ahead: at most two chunks per worker in flight
+                while len(pending) > 2 * workers:
+                    flush_one()
+            while pending:
+                flush_one()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - t0
+    print(f"✓ {rows} postings clustered in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f}/s), "
+          f"{errors} errors -> {target}", file=sys.stderr)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign candidate_clusters ids to job postings")
+    parser.add_argument("source", help="CSV or NDJSON file of postings")
+    parser.add_argument("target", help="output file (.csv or NDJSON)")
+    parser.add_argument("--chunksize", type=int, default=clustering.CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=clustering.CLUSTER_WORKERS, help="processes (0 = in this process)")
+    args = parser.parse_args(argv)
+    run(args.source, args.target, args.chunksize, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,47 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+import asyncio
+import json
+import multiprocessing
 import joblib
 import os
-import re
 import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+from app.services.execution import LimitedStreamingResponse, route_limit, run_cpu
+from app.services.projection import build_projector
+from app.services.text_cache import clean_text, text_cache
+
 router = APIRouter()
 MD = os.path.dirname(__file__)
 
-# Load artifacts
-try:
-    model = joblib.load(os.path.join(MD, "candidate_clusters.joblib"))
-    tfidf = joblib.load(os.path.join(MD, "tfidf_cv.joblib"))
-    svd = joblib.load(os.path.join(MD, "svd_cv.joblib"))
-    ohe = joblib.load(os.path.join(MD, "ohe_country.joblib"))
-    scaler = joblib.load(os.path.join(MD, "scaler_cv.joblib"))
-except Exception as e:
-    raise HTTPException(status_code=500, detail=f"Failed to load clustering artifacts: {str(e)}")
-
-def clean_text(t: str) -> str:
-    t = str(t).lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    return re.sub(r"\s+", " ", t).strip()
+# Artifacts are loaded on first use
+# source= lets MODEL_MMAP_DIR share their arrays between workers (app/services/model_registry.py)
+model = registry.register("ilyes.candidate_clusters", lambda: joblib.load(os.path.join(MD, "candidate_clusters.joblib")), source=os.path.join(MD, "candidate_clusters.joblib"))
+tfidf = registry.register("ilyes.tfidf_cv", lambda: joblib.load(os.path.join(MD, "tfidf_cv.joblib")), source=os.path.join(MD, "tfidf_cv.joblib"))
+svd = registry.register("ilyes.svd_cv", lambda: joblib.load(os.path.join(MD, "svd_cv.joblib")), source=os.path.join(MD, "svd_cv.joblib"))
+ohe = registry.register("ilyes.ohe_country", lambda: joblib.load(os.path.join(MD, "ohe_country.joblib")))
+scaler = registry.register("ilyes.scaler_cv", lambda: joblib.load(os.path.join(MD, "scaler_cv.joblib")))
+# tfidf_cv -> svd_cv folded into one float32 term table (app/services/projection.py),
+# checked against sklearn when built; with MODEL_MMAP_DIR the table is memory-mapped
+# and tfidf_cv/svd_cv are not loaded at all. Rebuilt when either file changes.
+projector = registry.register(
+    "ilyes.svd_projector",
+    lambda: build_projector(tfidf.get(), svd.get()),
+    source=[os.path.join(MD, "tfidf_cv.joblib"), os.path.join(MD, "svd_cv.joblib")],
+)
+
+def _load(artifact):
+    try:
+        return artifact.get()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load clustering artifacts: {str(e)}")
 
 class ClusterInput(BaseModel):
     job_title: str
@@ -31,18 +49,199 @@ class ClusterInput(BaseModel):
     skills: str
     country: str
 
-@router.post("/predict")
-def predict_cluster(data: ClusterInput):
+def build_row(data: ClusterInput):
     clean = clean_text(data.job_title + " " + data.company + " " + data.skills)
     num_skills = len(data.skills.split())
-    exp_length = len(data.skills.split())  # Assuming exp_length is num_skills
+    exp_length = num_skills  # Assuming exp_length is num_skills
+    return pd.DataFrame([{"clean": clean, "country": data.country, "num_skills": num_skills, "exp_length": exp_length}])
 
-    X_text = tfidf.transform([clean])
-    X_text_reduced = svd.transform(X_text)
-    X_country = ohe.transform([[data.country]])
-    X_num = scaler.transform([[num_skills, exp_length]])
+def _predict_rows(rows: pd.DataFrame):
+    # Term rows are shared by repeated postings (app/services/text_cache.py)
+    p = projector.get()
+    X_text_reduced = p.project(text_cache().rows("ilyes.svd_projector", p, rows["clean"], p.term_rows))
+    X_country = ohe.get().transform(rows[["country"]].to_numpy())
+    X_num = scaler.get().transform(rows[["num_skills", "exp_length"]].to_numpy())
     X = np.hstack([X_text_reduced, X_country, X_num])
+    return model.get().predict(X)
+
+# Concurrent /predict calls share one transform chain and one model.predict
+predict_rows = batcher("ilyes.clustering", _predict_rows)
+
+@router.post("/predict")
+def predict_cluster(data: ClusterInput):
+    for artifact in (projector, ohe, scaler, model):
+        _load(artifact)
+
+    cluster = int(predict_rows(build_row(data))[0])
+
+    return {"cluster": cluster}
+
+# =====================================================
+# BATCH / NDJSON CLUSTERING
+# =====================================================
+# Postings are labelled in chunks of CHUNK_ROWS: every stage of the chain runs
+# once per chunk, chunks run in parallel on CLUSTER_WORKERS processes (0 = in
+# this process, on the shared CPU pool) and results are emitted in input order
+# as soon as each chunk is done. cluster_postings.py is the offline CLI.
+CHUNK_ROWS = int(os.getenv("ILYES_CLUSTER_CHUNK", "2000"))
+CLUSTER_WORKERS = int(os.getenv("ILYES_CLUSTER_WORKERS", str(min(4, os.cpu_count() or 1))))
+FIELDS = list(ClusterInput.model_fields)
+
+def rows_from_records(df: pd.DataFrame):
+    """build_row() for a whole frame of postings (missing fields count as empty)"""
+    df = df.reindex(columns=FIELDS).fillna("").astype(str)
+    clean = (df["job_title"] + " " + df["company"] + " " + df["skills"]).map(clean_text)
+    num_skills = df["skills"].str.split().str.len()
+    return pd.DataFrame({"clean": clean, "country": df["country"], "num_skills": num_skills, "exp_length": num_skills})
+
+def predict_records(records):
+    """Cluster ids for a list of posting dicts"""
+    if not records:
+        return []
+    return [int(c) for c in _predict_rows(rows_from_records(pd.DataFrame.from_records(records, columns=FIELDS)))]
+
+def validate_posting(record):
+    """(posting dict, None) or (None, error): the same check as ClusterInput on /predict"""
+    try:
+        return ClusterInput(**record).model_dump(), None
+    except ValidationError as e:
+        return None, "invalid posting: " + "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+def parse_ndjson_line(line):
+    """(posting dict, None) or (None, error) for one NDJSON line"""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return None, f"invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return None, "expected a JSON object"
+    return validate_posting(record)
+
+def label_parsed(parsed):
+    """{"cluster"} or {"error"} per (posting, error) pair, in order"""
+    clusters = iter(predict_records([r for r, error in parsed if error is None]))
+    return [{"error": error} if error else {"cluster": next(clusters)} for _, error in parsed]
+
+def label_lines(lines):
+    """label_parsed() of raw NDJSON lines; one chunk of work for the pool workers"""
+    return label_parsed([parse_ndjson_line(line) for line in lines])
+
+def chunk_failed(n, e):
+    """Result of a chunk whose job raised: every posting in it gets the error"""
+    return [{"error": f"chunk failed: {type(e).__name__}: {e}"}] * n
+
+_pool = None
+
+def cluster_pool(workers=None):
+    """Process pool shared by the batch endpoint (spawned: workers load the models themselves)."""
+    global _pool
+    workers = CLUSTER_WORKERS if workers is None else workers
+    if workers <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def _drop_pool(pool):
+    """Forget a broken pool so the next chunk starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _ndjson(start, items):
+    return "".join(json.dumps({"index": i, **item}) + "\n" for i, item in enumerate(items, start=start)).encode()
+
+async def _lines(request: Request, uploaded: asyncio.Event):
+    """Non-blank lines of the upload as they arrive; sets uploaded once it is fully read"""
+    try:
+        buffer = b""
+        async for part in request.stream():
+            buffer += part
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+    finally:
+        uploaded.set()
+
+async def _stream_clusters(request: Request, uploaded: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    pending = deque()  # (start, size, pool, future) in input order
+
+    def submit(start, lines):
+        pool = cluster_pool()
+        try:
+            fut = loop.run_in_executor(pool, label_lines, lines) if pool else asyncio.ensure_future(run_cpu(label_lines, lines))
+        except BrokenExecutor as e:
+            _drop_pool(pool)
+            fut = loop.create_future()
+            fut.set_exception(e)
+        pending.append((start, len(lines), pool, fut))
+
+    async def finish():
+        start, size, pool, fut = pending.popleft()
+        try:
+            items = await fut
+        except Exception as e:
+            # Reported in the stream: the 200 and earlier chunks are already sent
+            if isinstance(e, BrokenExecutor):
+                _drop_pool(pool)
+            items = chunk_failed(size, e)
+        return _ndjson(start, items)
+
+    start, lines = 0, []
+    async for line in _lines(request, uploaded):
+        lines.append(line)
+        if len(lines) >= CHUNK_ROWS:
+            submit(start, lines)
+            start, lines = start + len(lines), []
+            # Bounded look-ahead: at most two chunks per worker in flight; the
+            # upload is not read further until the oldest one is written
+            while len(pending) > 2 * max(CLUSTER_WORKERS, 1):
+                yield await finish()
+    if lines:
+        submit(start, lines)
+    while pending:
+        yield await finish()
+
+class UploadStreamingResponse(LimitedStreamingResponse):
+    """Streams results while the request body is still being read.
+
+    StreamingResponse listens on receive() for disconnects while it streams,
+    which would swallow the upload's body messages; listening starts only once
+    the body generator has read the whole upload.
+    """
+
+    def __init__(self, content, release, uploaded, **kwargs):
+        super().__init__(content, release, **kwargs)
+        self.uploaded = uploaded
+
+    async def listen_for_disconnect(self, receive):
+        await self.uploaded.wait()
+        await super().listen_for_disconnect(receive)
+
+BATCH_LIMIT = route_limit("ilyes.clustering.batch", 2, 4)
 
-    cluster = int(model.predict(X)[0])
+@router.post("/predict-batch")
+async def predict_cluster_batch(request: Request):
+    """JSON array of postings -> {"clusters": [...]}; NDJSON body -> NDJSON stream of {"index", "cluster" | "error"}"""
+    for artifact in (projector, ohe, scaler, model):
+        _load(artifact)
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            items = [ClusterInput(**r).model_dump() for r in await request.json()]
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"count": len(items), "clusters": await BATCH_LIMIT.run(predict_records, items)}
 
-    return {"cluster": cluster}
\ No newline at end of file
+    # The upload is read chunk by chunk while results stream back
+    uploaded = asyncio.Event()
+    return await BATCH_LIMIT.streaming_response(
+        _stream_clusters(request, uploaded),
+        response_class=UploadStreamingResponse,
+        uploaded=uploaded,
+        media_type="application/x-ndjson",
+    )
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from typing import List
 import joblib
 import os
-import re
 import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer, FeatureHasher
@@ -10,22 +10,34 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from scipy.sparse import hstack, csr_matrix
 import xgboost as xgb
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+from app.services.execution import route_limit
+from app.services.text_cache import clean_text, text_cache
+
 router = APIRouter()
 MD = os.path.dirname(__file__)
 
-# Load artifacts
-try:
-    tfidf = joblib.load(os.path.join(MD, "tfidf_for_mlp.joblib"))
-    ohe = joblib.load(os.path.join(MD, "ohe_country.joblib"))
-    scaler = joblib.load(os.path.join(MD, "scaler_cv.joblib"))
-    model = joblib.load(os.path.join(MD, "xgb_remote_final.joblib"))
-except Exception as e:
-    raise HTTPException(status_code=500, detail=f"Failed to load model artifacts: {str(e)}")
+# Artifacts saved by obj1.xgb.ipynb next to xgb_remote_final.joblib; loaded on first use
+tfidf = registry.register("ilyes.tfidf", lambda: joblib.load(os.path.join(MD, "tfidf.joblib")))
+ohe = registry.register("ilyes.ohe", lambda: joblib.load(os.path.join(MD, "ohe.joblib")))
+scaler = registry.register("ilyes.scaler", lambda: joblib.load(os.path.join(MD, "scaler.joblib")))
+model = registry.register("ilyes.xgb_remote_final", lambda: joblib.load(os.path.join(MD, "xgb_remote_final.joblib")))
+# Country -> one-hot column; same result as ohe.transform (unknown -> empty row) without its per-call validation
+country_index = registry.register("ilyes.ohe.index", lambda: {c: i for i, c in enumerate(_load(ohe).categories_[0])})
 
-def clean_text(t: str) -> str:
-    t = str(t).lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    return re.sub(r"\s+", " ", t).strip()
+# Training layout (obj1.xgb.ipynb), all blocks sparse:
+# [tfidf (15000 terms) | CountryName one-hot | company hash | title hash | 4 scaled numerics]
+TFIDF_TERMS = 15000  # TfidfVectorizer(max_features=15000, ngram_range=(1, 3), min_df=3, max_df=0.9)
+COMPANY_HASH = FeatureHasher(n_features=256, input_type="dict")
+TITLE_HASH = FeatureHasher(n_features=128, input_type="dict")
+NUMERIC = ["num_skills", "title_len", "unique_words", "avg_word_len"]
+
+def _load(artifact):
+    try:
+        return artifact.get()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load model artifacts: {str(e)}")
 
 class RemoteInput(BaseModel):
     job_title: str
@@ -33,19 +45,107 @@ class RemoteInput(BaseModel):
     skills: str
     country: str
 
+def build_rows(items):
+    """Raw fields + numeric features of each posting, one row per item"""
+    rows = []
+    for data in items:
+        clean = clean_text(data.job_title + " " + data.company + " " + data.skills)
+        words = clean.split()
+        rows.append({
+            "clean": clean,
+            "company": str(data.company),
+            "title": str(data.job_title),
+            "CountryName": data.country.strip().lower(),
+            "num_skills": len(data.skills.split()),
+            "title_len": len(data.job_title.split()),
+            "unique_words": len(set(words)),
+            "avg_word_len": float(np.mean([len(w) for w in words])) if words else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+def layout():
+    """Width of each block as loaded, against the column count the booster was trained with."""
+    widths = {
+        "tfidf": len(_load(tfidf).vocabulary_),
+        "country": len(_load(ohe).categories_[0]),
+        "company": COMPANY_HASH.n_features,
+        "title": TITLE_HASH.n_features,
+        "numeric": int(_load(scaler).n_features_in_),
+    }
+    return {**widths, "total": sum(widths.values()), "trained_tfidf": TFIDF_TERMS, "trained_total": int(_load(model).n_features_in_)}
+
+def check_layout():
+    """503 unless the loaded artifacts produce exactly the booster's columns.
+
+    Every text term must land in the column the booster learned for it, so a
+    vectorizer with another vocabulary size can't be used (the shipped
+    tfidf.joblib has fewer terms than the one the booster was trained with).
+    """
+    widths = layout()
+    if widths["tfidf"] != TFIDF_TERMS or widths["total"] != widths["trained_total"]:
+        raise HTTPException(
+            status_code=503,
+            detail=(f"Remote model unavailable: tfidf.joblib has {widths['tfidf']} terms and the features "
+                    f"{widths['total']} columns, the booster was trained with {TFIDF_TERMS} terms and "
+                    f"{widths['trained_total']} columns; export the training vectorizer from obj1.xgb.ipynb"),
+        )
+    return widths
+
+def build_features(rows: pd.DataFrame):
+    """One CSR matrix in the booster's column order; nothing is densified."""
+    check_layout()
+    # Same posting text -> cached TF-IDF row (app/services/text_cache.py)
+    X_text = text_cache().rows("ilyes.tfidf", _load(tfidf), rows["clean"])
+    cols = [_load(country_index).get(c) for c in rows["CountryName"]]
+    hits = [i for i, c in enumerate(cols) if c is not None]
+    X_country = csr_matrix(
+        (np.ones(len(hits)), (hits, [cols[i] for i in hits])),
+        shape=(len(rows), len(_load(ohe).categories_[0]))
+    )
+    X_company = COMPANY_HASH.transform({"company": c} for c in rows["company"])
+    X_title = TITLE_HASH.transform({"title": t} for t in rows["title"])
+    X_num = csr_matrix(_load(scaler).transform(rows[NUMERIC].to_numpy(dtype=float)))
+    return hstack([X_text, X_country, X_company, X_title, X_num], format="csr")
+
+def predict_proba(rows: pd.DataFrame):
+    X = build_features(rows)
+    return _load(model).get_booster().predict(xgb.DMatrix(X))
+
+def _result(p):
+    return {"prediction": int(p >= 0.5), "probability": float(p)}
+
+# Concurrent /predict calls share one feature build and one DMatrix (app/services/batching.py)
+predict_rows = batcher("ilyes.remote", predict_proba)
+
 @router.post("/predict")
 def predict_remote(data: RemoteInput):
     try:
-        clean = clean_text(data.job_title + " " + data.company + " " + data.skills)
-        num_skills = len(data.skills.split())
-        exp_length = len(data.skills.split())  # Assuming exp_length is num_skills
+        check_layout()
+        return _result(predict_rows(build_rows([data]))[0])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Whole batches run on the shared CPU pool (app/services/execution.py)
+BATCH_LIMIT = route_limit("ilyes.remote.batch", 2, 8)
 
-        X_text = tfidf.transform([clean])
-        X_text_reduced = X_text.toarray()
-        X_country = ohe.transform([[data.country]])
-        X_num = scaler.transform([[num_skills, exp_length]])
-        X = np.hstack([X_text_reduced, X_country, X_num])
+def _predict_batch(items):
+    if not items:
+        return {"count": 0, "predictions": []}
+    return {"count": len(items), "predictions": [_result(p) for p in predict_proba(build_rows(items))]}
 
-        return {"shape": X.shape[1]}
+@router.post("/predict-batch")
+async def predict_remote_batch(items: List[RemoteInput]):
+    try:
+        check_layout()
+        return await BATCH_LIMIT.run(_predict_batch, items)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/layout")
+def feature_layout():
+    widths = layout()
+    return {**widths, "compatible": widths["tfidf"] == TFIDF_TERMS and widths["total"] == widths["trained_total"]}
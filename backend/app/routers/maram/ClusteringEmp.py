@@ -57,10 +57,16 @@ CLUSTER_METADATA = {
 import joblib
 import os
 
+from app.services.model_registry import registry
+from app.services.batching import batcher
+
 BASE_DIR = os.path.dirname(__file__)
 
-SCALER = joblib.load(os.path.join(BASE_DIR, "scaler.joblib"))
-KMEANS = joblib.load(os.path.join(BASE_DIR, "kmeans.joblib"))
+SCALER = registry.register("maram.clustering.scaler", lambda: joblib.load(os.path.join(BASE_DIR, "scaler.joblib")))
+KMEANS = registry.register("maram.clustering.kmeans", lambda: joblib.load(os.path.join(BASE_DIR, "kmeans.joblib")))
+
+# Concurrent /predict calls share one scaler.transform + kmeans.predict
+PREDICT = batcher("maram.clustering", lambda X: KMEANS.get().predict(SCALER.get().transform(X)))
 
 
 from fastapi import APIRouter
@@ -80,8 +86,7 @@ def predict(data: ClusterInput):
         if k in X.columns:
             X.at[0, k] = float(v)
 
-    X_scaled = SCALER.transform(X)
-    cluster_id = int(KMEANS.predict(X_scaled)[0])
+    cluster_id = int(PREDICT(X)[0])
 
     meta = CLUSTER_METADATA[cluster_id]
 
@@ -0,0 +1,111 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# COLUMNAR DATASET CACHE
+# =====================================================
+# job_postings.csv is converted once into a directory of .npy files next to it
+# (<name>.columnar/): string columns as category codes (in the int dtype pandas
+# itself picks for them) + their categories, dates as int64 nanoseconds, numbers
+# as-is. Later starts memory-map the arrays and wrap them without copying, so the
+# frame's columns are read-only views of the page cache instead of a re-parsed
+# CSV and a re-run pd.to_datetime. The cache is rebuilt whenever the CSV's size
+# or mtime changes.
+
+CACHE_VERSION = 2
+META_FILE = "meta.json"
+
+
+def cache_dir_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".columnar"
+
+
+def source_stamp(csv_path):
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "version": CACHE_VERSION}
+
+
+def to_columnar(df):
+    """String columns become pandas categoricals (integer codes + categories in order of appearance)."""
+    df = df.copy()
+    for name in df.columns:
+        if df[name].dtype == object:
+            codes, categories = pd.factorize(df[name])
+            df[name] = pd.Categorical.from_codes(codes, categories=categories)
+    return df
+
+
+def write_cache(df, cache_dir, stamp):
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        entry = {"name": name, "file": f"{i}.npy"}
+        if isinstance(col.dtype, pd.CategoricalDtype) or col.dtype == object:
+            codes, categories = pd.factorize(col)
+            # int8/int16/... as Categorical stores them, so read_cache's from_codes keeps the memmap
+            codes = pd.Categorical.from_codes(codes, categories=categories).codes
+            np.save(os.path.join(tmp_dir, entry["file"]), codes)
+            entry.update(kind="category", categories=np.asarray(categories, dtype=object).tolist())
+        elif pd.api.types.is_datetime64_any_dtype(col.dtype):
+            np.save(os.path.join(tmp_dir, entry["file"]), col.to_numpy(dtype="datetime64[ns]").view(np.int64))
+            entry.update(kind="datetime")
+        else:
+            np.save(os.path.join(tmp_dir, entry["file"]), col.to_numpy())
+            entry.update(kind="numeric")
+        columns.append(entry)
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"source": stamp, "rows": len(df), "columns": columns}, f)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def read_cache(cache_dir, stamp):
+    """The cached frame, or None if there is no cache or it is stale.
+
+    Every column is backed by its read-only memmap (copy=False), so the frame
+    must not be modified in place.
+    """
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("source") != stamp:
+        return None
+    data = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(cache_dir, entry["file"]), mmap_mode="r")
+        if entry["kind"] == "category":
+            data[entry["name"]] = pd.Categorical.from_codes(values, categories=entry["categories"])
+        elif entry["kind"] == "datetime":
+            data[entry["name"]] = np.asarray(values).view("datetime64[ns]")
+        else:
+            data[entry["name"]] = values
+    return pd.DataFrame(data, columns=[e["name"] for e in meta["columns"]], copy=False)
+
+
+def load_csv_columnar(csv_path, date_columns=()):
+    """Read csv_path through the columnar cache, (re)building it when stale."""
+    stamp = source_stamp(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    try:
+        df = read_cache(cache_dir, stamp)
+        if df is not None:
+            return df, True
+    except Exception as e:
+        print(f"✗ Ignoring unreadable dataset cache {cache_dir}: {e}")
+    df = pd.read_csv(csv_path)
+    for col in date_columns:
+        df[col] = pd.to_datetime(df[col])
+    df = to_columnar(df)
+    try:
+        write_cache(df, cache_dir, stamp)
+    except Exception as e:
+        print(f"✗ Could not write dataset cache {cache_dir}: {e}")
+    return df, False
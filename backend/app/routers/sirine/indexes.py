@@ -0,0 +1,331 @@
+import json
+from bisect import bisect_left
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# =====================================================
+# MONTHLY POSTING COUNTS
+# =====================================================
+# Dense (keys x months) matrices built once from the dataset, so the trend
+# helpers in router.py read lag / rolling features by row lookup instead of
+# filtering the whole frame and re-running groupby(pd.Grouper(freq='ME')).
+
+class MonthlyCounts:
+    """Monthly row counts per key (skill, country or job title)."""
+
+    def __init__(self, keys, counts, totals):
+        self.keys = keys                  # np.ndarray of labels, in order of first appearance
+        self.counts = counts              # int64 (n_keys, n_months), rows with a posting date
+        self.totals = totals              # int64 (n_keys,), all rows (dated or not)
+        self.position = {k: i for i, k in enumerate(keys)}
+        nonzero = counts > 0
+        has_any = nonzero.any(axis=1)
+        n_months = counts.shape[1]
+        self.first = np.where(has_any, nonzero.argmax(axis=1), 0)
+        self.last = np.where(has_any, n_months - 1 - nonzero[:, ::-1].argmax(axis=1), -1)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def find(self, text):
+        """First key (in order of appearance) containing text, case-insensitive."""
+        if not hasattr(self, '_lower'):
+            self._lower = [str(k).lower() for k in self.keys]
+        text = text.lower()
+        return next((k for k, low in zip(self.keys, self._lower) if text in low), None)
+
+    def total(self, key):
+        i = self.position.get(key)
+        return int(self.totals[i]) if i is not None else 0
+
+    def monthly(self, key):
+        """Same values as df[df[col] == key].groupby(pd.Grouper(freq='ME')).size()."""
+        i = self.position.get(key)
+        if i is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.counts[i, self.first[i]:self.last[i] + 1]
+
+    def monthly_combined(self, mask):
+        """Monthly counts of the union of the keys selected by a boolean mask."""
+        summed = self.counts[mask].sum(axis=0)
+        nz = np.flatnonzero(summed)
+        if not len(nz):
+            return np.zeros(0, dtype=np.int64)
+        return summed[nz[0]:nz[-1] + 1]
+
+    def growth_table(self, window=3, min_months=6):
+        """Vectorised (tail(window).mean() - head(window).mean()) / head mean, in percent.
+
+        Returns (growth, valid) arrays over all keys; valid is False where the
+        span is shorter than min_months or the older mean is zero.
+        """
+        n_keys, n_months = self.counts.shape
+        if not n_months:
+            return np.zeros(n_keys), np.zeros(n_keys, dtype=bool)
+        span = self.last - self.first + 1
+        offsets = np.arange(window)
+        rows = np.arange(n_keys)[:, None]
+        head = self.counts[rows, np.clip(self.first[:, None] + offsets, 0, n_months - 1)].mean(axis=1)
+        tail = self.counts[rows, np.clip(self.last[:, None] - offsets, 0, n_months - 1)].mean(axis=1)
+        valid = (span >= min_months) & (head > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(valid, (tail - head) / head * 100, 0.0)
+        return growth, valid
+
+
+class CountryTrends:
+    """Global country trend table and per-location market series, per dataset version.
+
+    The table only depends on the dataset, so it is built once; location
+    lookups (substring match over country names, as str.contains did) are
+    memoized by their lower-cased text.
+    """
+
+    def __init__(self, countries, max_countries=100, min_jobs=100):
+        self.countries = countries
+        self.names = pd.Series(countries.keys, dtype=object)
+        growth, valid = countries.growth_table()
+        trends = []
+        for i in range(min(max_countries, len(countries.keys))):
+            if countries.totals[i] < min_jobs or not valid[i]: continue
+            trends.append({'country': str(countries.keys[i]), 'percent_change': round(float(growth[i]), 2), 'job_count': int(countries.totals[i])})
+        trends.sort(key=lambda x: x['percent_change'], reverse=True)
+        self.table = {'top_growing': trends[:10], 'top_declining': trends[-10:], 'all_countries': trends}
+        self._location = lru_cache(maxsize=1024)(self._lookup)
+
+    def _lookup(self, location):
+        mask = self.names.str.contains(location, case=False, na=False).to_numpy()
+        market_size = int(self.countries.totals[mask].sum())
+        monthly = self.countries.monthly_combined(mask)
+        monthly.setflags(write=False)
+        rank = next((i + 1 for i, c in enumerate(self.table['all_countries']) if location in c['country'].lower()), None)
+        return monthly, market_size, rank
+
+    def location(self, location):
+        """(monthly counts, market size, global rank) for every country whose name contains location."""
+        return self._location(location.lower())
+
+
+def _monthly_counts(values, month, n_months):
+    codes, keys = pd.factorize(values)
+    n_keys = len(keys)
+    totals = np.bincount(codes[codes >= 0], minlength=n_keys).astype(np.int64)
+    dated = (codes >= 0) & (month >= 0)
+    flat = np.bincount(codes[dated] * n_months + month[dated], minlength=n_keys * n_months)
+    counts = flat.astype(np.int64).reshape(n_keys, n_months)
+    return MonthlyCounts(np.asarray(keys, dtype=object), counts, totals)
+
+
+class TimeSeriesIndex:
+    """Monthly posting counts per skill, country and job title."""
+
+    def __init__(self, dataset):
+        dates = pd.to_datetime(dataset['Job_Posted_Date'])
+        ordinal = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.float64)
+        has_date = ~np.isnan(ordinal)
+        start = int(np.nanmin(ordinal)) if has_date.any() else 0
+        self.n_months = int(np.nanmax(ordinal)) - start + 1 if has_date.any() else 0
+        month = np.where(has_date, np.nan_to_num(ordinal) - start, -1).astype(np.int64)
+
+        self.skills = _monthly_counts(dataset['Skill_Name'], month, self.n_months)
+        self.titles = _monthly_counts(dataset['job_title_short'], month, self.n_months)
+        self.countries = (
+            _monthly_counts(dataset['CountryName'], month, self.n_months)
+            if 'CountryName' in dataset.columns else None
+        )
+        self.n_rows = len(dataset)
+
+
+# =====================================================
+# SKILL CO-OCCURRENCE (INVERTED INDEX)
+# =====================================================
+
+# At most this many important skills are kept per title profile
+PROFILE_SIZE = 20
+
+
+def normalize_skill(skill):
+    return str(skill).lower().replace(' ', '')
+
+
+def _count_matrix(rows, cols, shape):
+    keep = (rows >= 0) & (cols >= 0)
+    data = np.ones(int(keep.sum()), dtype=np.int32)
+    # duplicate (row, col) pairs are summed, i.e. cells hold dataset row counts
+    return sparse.csr_matrix((data, (rows[keep], cols[keep])), shape=shape)
+
+
+class SkillIndex:
+    """Sparse posting x skill and title x skill count matrices over the dataset.
+
+    Replaces the isin()/value_counts() scans: "skills of the postings (or
+    titles) that mention any of these skills" is two sparse mat-vec products.
+    """
+
+    def __init__(self, dataset):
+        skill_codes, skills = pd.factorize(dataset['Skill_Name'])
+        posting_codes, postings = pd.factorize(dataset['JobPosting_Key'])
+        title_codes, titles = pd.factorize(dataset['job_title_short'])
+        self.skills = np.asarray(skills, dtype=object)
+        self.titles = np.asarray(titles, dtype=object)
+        self.position = {k: i for i, k in enumerate(self.skills)}
+        n_skills, n_titles = len(skills), len(titles)
+
+        self.posting_skill = _count_matrix(posting_codes, skill_codes, (len(postings), n_skills))
+        self.skill_posting = self.posting_skill.T.tocsr()
+        self.title_skill = _count_matrix(title_codes, skill_codes, (n_titles, n_skills))
+        self.skill_title = self.title_skill.T.tocsr()
+        # every row of a title, including rows without a skill
+        self.title_rows = np.bincount(title_codes[title_codes >= 0], minlength=n_titles).astype(np.int64)
+
+        # distinct postings per title (a missing posting key counts once, like unique())
+        pairs = pd.DataFrame({'title': title_codes, 'posting': posting_codes}).drop_duplicates()
+        pairs = pairs[pairs['title'] >= 0]
+        self.title_postings = np.bincount(pairs['title'], minlength=n_titles).astype(np.int64)
+
+        self.normalized = {}
+        for i, skill in enumerate(self.skills):
+            self.normalized.setdefault(normalize_skill(skill), []).append(i)
+        self._build_profiles()
+
+    def _build_profiles(self, threshold=0.1, limit=PROFILE_SIZE):
+        """Each title's important skills: listed in >= threshold x its postings, top `limit` by count."""
+        self.profiles = []
+        rows, cols = [], []
+        ts = self.title_skill   # canonical CSR: column indices sorted within each row
+        for t in range(len(self.titles)):
+            skills_t = ts.indices[ts.indptr[t]:ts.indptr[t + 1]]
+            counts_t = ts.data[ts.indptr[t]:ts.indptr[t + 1]]
+            order = np.argsort(-counts_t, kind='stable')
+            important = skills_t[order[counts_t[order] >= self.title_postings[t] * threshold]][:limit]
+            self.profiles.append([str(self.skills[i]) for i in important])
+            rows.extend([t] * len(important))
+            cols.extend(important)
+        self.profile_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=self.title_skill.shape
+        )
+        self.profile_sizes = np.diff(self.profile_matrix.indptr)
+
+    def profile_matches(self, user_skills_norm):
+        """Number of important skills per title whose normalized name is in user_skills_norm."""
+        u = np.zeros(len(self.skills), dtype=np.int64)
+        for name in user_skills_norm:
+            u[self.normalized.get(name, [])] = 1
+        return self.profile_matrix @ u
+
+    def user_vector(self, user_skills):
+        u = np.zeros(len(self.skills), dtype=np.int64)
+        for skill in user_skills:
+            i = self.position.get(skill)
+            if i is not None:
+                u[i] = 1
+        return u
+
+    def complementary_counts(self, user_skills):
+        """Per-skill row counts over the postings that list any of user_skills."""
+        hit = (self.posting_skill @ self.user_vector(user_skills)) > 0
+        return self.skill_posting @ hit.astype(np.int64)
+
+    def title_counts(self, user_skills):
+        """Per-title row counts of user_skills."""
+        return self.title_skill @ self.user_vector(user_skills)
+
+    def cluster_counts(self, title_hits):
+        """Per-skill row counts and total rows over the titles with a hit."""
+        hit = title_hits > 0
+        return self.skill_title @ hit.astype(np.int64), int(self.title_rows[hit].sum())
+
+    @staticmethod
+    def ranked(counts):
+        """Indices of the non-zero counts, largest first (ties by first appearance)."""
+        nz = np.flatnonzero(counts)
+        return nz[np.argsort(-counts[nz], kind='stable')]
+
+
+# =====================================================
+# JOB EMBEDDINGS (OBJECTIVE 5 RECOMMENDER)
+# =====================================================
+
+class JobEmbeddings:
+    """The job-skill matrix projected through svd + scaler once, L2-normalized.
+
+    Cosine similarity of users against every job is then a single matrix
+    product; user vectors are built from a skill -> column dict.
+    """
+
+    def __init__(self, job_skill_matrix, svd, scaler):
+        self.titles = [str(t) for t in job_skill_matrix.index]
+        self.skill_column = {}
+        for i, skill in enumerate(job_skill_matrix.columns):
+            self.skill_column.setdefault(skill, i)   # first column wins, like list.index()
+        self.n_skills = job_skill_matrix.shape[1]
+        self.svd = svd
+        self.scaler = scaler
+        self.jobs = normalize(scaler.transform(svd.transform(job_skill_matrix.values)))
+        values = job_skill_matrix.values
+        columns = [str(s) for s in job_skill_matrix.columns]
+        self.required_skills = [[columns[j] for j in np.flatnonzero(row > 0)] for row in values]
+
+    def user_vectors(self, users):
+        """Binary (n_users, n_skills) matrix for a list of skill lists."""
+        X = np.zeros((len(users), self.n_skills))
+        for u, skills in enumerate(users):
+            for skill in skills:
+                j = self.skill_column.get(skill)
+                if j is not None:
+                    X[u, j] = 1
+        return X
+
+    def similarities(self, X):
+        """Cosine similarity (n_users, n_jobs) between user skill vectors and every job."""
+        users = normalize(self.scaler.transform(self.svd.transform(X)))
+        return users @ self.jobs.T
+
+    @staticmethod
+    def top_k(scores, k):
+        """Indices of the k best scores, best first (ties: higher index first, as argsort()[::-1])."""
+        if len(scores) > k:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.lexsort((-candidates, -scores[candidates]))]
+
+
+# =====================================================
+# VOCABULARIES (SKILL / TITLE LISTS)
+# =====================================================
+
+class Vocabulary:
+    """A list served as-is (JSON encoded once) plus case-insensitive prefix / substring search."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.json = json.dumps(self.values).encode("utf-8")
+        ordered = sorted(self.values, key=lambda v: (str(v).lower(), str(v)))
+        self._keys = [str(v).lower() for v in ordered]
+        self._ordered = ordered
+
+    def search(self, prefix, limit=None):
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._ordered[start:end]
+
+    def contains(self, text, limit=None):
+        """Values containing text anywhere (case-insensitive): the prefix matches first, then the rest."""
+        found = self.search(text, limit)
+        if limit is not None and len(found) >= limit:
+            return found
+        text = text.lower()
+        for key, value in zip(self._keys, self._ordered):
+            if text in key and not key.startswith(text):
+                found.append(value)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
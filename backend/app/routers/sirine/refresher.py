@@ -0,0 +1,122 @@
+import os
+import time
+import hashlib
+import threading
+
+from .dataset_cache import source_stamp
+
+# =====================================================
+# DATASET SNAPSHOTS + BACKGROUND REFRESH
+# =====================================================
+# The dataset and everything derived from it are built together into one
+# immutable DatasetSnapshot. A daemon thread polls job_postings.csv and, when
+# it changed, builds the next snapshot off the request path and swaps it in
+# with a single reference assignment: requests see either the old or the new
+# snapshot, never a mix of half-built indexes.
+
+
+class DatasetSnapshot:
+    def __init__(self, version, stamp, dataset, indexes=None, from_cache=False, build_seconds=0.0):
+        self.version = version
+        self.stamp = stamp                # source_stamp() of the CSV it was built from, None if missing
+        self.dataset = dataset
+        self.indexes = indexes or {}      # name -> derived structure (see router.build_snapshot)
+        self.from_cache = from_cache
+        self.build_seconds = build_seconds
+        self.built_at = time.time()
+        # Stable across restarts and workers: derived from the source file, not the version counter
+        source = f"{stamp['size']}-{stamp['mtime_ns']}" if stamp else "none"
+        self.etag = hashlib.sha1(source.encode()).hexdigest()[:16]
+
+    def status(self):
+        return {
+            "version": self.version,
+            "rows": int(len(self.dataset)) if self.dataset is not None else 0,
+            "source_size": self.stamp["size"] if self.stamp else None,
+            "source_mtime": self.stamp["mtime_ns"] / 1e9 if self.stamp else None,
+            "from_cache": self.from_cache,
+            "build_seconds": round(self.build_seconds, 4),
+            "built_at": self.built_at,
+        }
+
+
+def current_stamp(path):
+    return source_stamp(path) if os.path.exists(path) else None
+
+
+class DatasetRefresher:
+    """Rebuilds the snapshot held by a registry artifact whenever `path` changes."""
+
+    def __init__(self, artifact, path, build, interval):
+        self.artifact = artifact          # LazyArtifact whose value is a DatasetSnapshot
+        self.path = path
+        self.build = build                # build(version) -> DatasetSnapshot
+        self.interval = interval
+        self.refreshing = False
+        self.last_check = None
+        self.last_error = None
+        self._pending = None              # changed stamp seen once, rebuilt when seen again
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sirine-dataset-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self, settle=True):
+        """Swap in a new snapshot if the file changed; returns True when it did.
+
+        With settle, a change is only picked up once the file has kept the same
+        size/mtime for a whole poll interval, so a CSV still being written is
+        not loaded half-way. Nothing is compared until the artifact has been
+        loaded; its first get() reads the file as it is then.
+        """
+        with self._lock:
+            self.last_check = time.time()
+            if not self.artifact.loaded:
+                self._pending = None
+                return False
+            current = self.artifact.get()
+            stamp = current_stamp(self.path)
+            if stamp == current.stamp:
+                self._pending = None
+                return False
+            if settle and stamp != self._pending:
+                self._pending = stamp
+                return False
+            self._pending = None
+            self.refreshing = True
+            try:
+                snapshot = self.build(current.version + 1)
+                self.artifact.replace(snapshot, load_seconds=snapshot.build_seconds)
+                self.last_error = None
+                return True
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"✗ Dataset refresh failed: {self.last_error}")
+                return False
+            finally:
+                self.refreshing = False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def status(self):
+        return {
+            "poll_seconds": self.interval,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "refreshing": self.refreshing,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+        }
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Query, Response
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict, Any
 import json
+import asyncio
 import joblib
 import numpy as np
 import pandas as pd
 import os
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.metrics.pairwise import cosine_similarity
 
+from app.services.model_registry import registry
+from app.services.execution import route_limit
+from .dataset_cache import load_csv_columnar
+from .indexes import TimeSeriesIndex, CountryTrends, SkillIndex, JobEmbeddings, Vocabulary
+from .refresher import DatasetSnapshot, DatasetRefresher, current_stamp
+
 # Initialize the router
 router = APIRouter(
     prefix="/api",
@@ -33,6 +42,11 @@ class AnalysisRequest(BaseModel):
     name: Optional[str] = None
     email: Optional[str] = None
 
+class CareerForecastBatchRequest(BaseModel):
+    # Substrings matched against job titles like desired_role; all titles when omitted
+    roles: Optional[List[str]] = None
+    top_n: Optional[int] = Field(None, ge=1)
+
 # =====================================================
 # SAFE MODEL LOADER
 # =====================================================
@@ -49,270 +63,450 @@ def safe_load(path, name):
         return None
 
 # =====================================================
-# LOAD MODELS (ONCE AT STARTUP)
+# LOAD MODELS (LAZILY, ON FIRST USE)
 # =====================================================
-MODELS = {
+def _model(name, *parts):
+    return lambda: safe_load(os.path.join(MODELS_DIR, *parts), name)
+
+MODELS = registry.group("sirine", {
     # Objective 1
-    "job_trend": safe_load(os.path.join(MODELS_DIR, 'Objective 1', 'best_job_trend_model.pkl'), "Job Trend"),
-    "job_title_encoder": safe_load(os.path.join(MODELS_DIR, 'Objective 1', 'job_title_encoder.pkl'), "Title Encoder"),
-    "job_trend_scaler": safe_load(os.path.join(MODELS_DIR, 'Objective 1', 'scaler.pkl'), "Trend Scaler"),
+    "job_trend": _model("Job Trend", 'Objective 1', 'best_job_trend_model.pkl'),
+    "job_title_encoder": _model("Title Encoder", 'Objective 1', 'job_title_encoder.pkl'),
+    "job_trend_scaler": _model("Trend Scaler", 'Objective 1', 'scaler.pkl'),
 
     # Objective 2
-    "country_growth": safe_load(os.path.join(MODELS_DIR, 'Objective 2', 'final_linear_regression_model.pkl'), "Country Growth"),
+    "country_growth": _model("Country Growth", 'Objective 2', 'final_linear_regression_model.pkl'),
 
     # Objective 3
-    "kmeans": safe_load(os.path.join(MODELS_DIR, 'Objective 3', 'final_kmeans_pca_model.pkl'), "KMeans"),
-    "pca": safe_load(os.path.join(MODELS_DIR, 'Objective 3', 'pca_transformer.pkl'), "PCA"),
-    "cluster_scaler": safe_load(os.path.join(MODELS_DIR, 'Objective 3', 'scaler.pkl'), "Cluster Scaler"),
+    "kmeans": _model("KMeans", 'Objective 3', 'final_kmeans_pca_model.pkl'),
+    "pca": _model("PCA", 'Objective 3', 'pca_transformer.pkl'),
+    "cluster_scaler": _model("Cluster Scaler", 'Objective 3', 'scaler.pkl'),
 
     # Objective 4
-    "skill_demand": safe_load(os.path.join(MODELS_DIR, 'Objective 4', 'final_xgb_skill_model.pkl'), "Skill Demand"),
+    "skill_demand": _model("Skill Demand", 'Objective 4', 'final_xgb_skill_model.pkl'),
 
     # Objective 5
-    "job_recommender": safe_load(os.path.join(MODELS_DIR, 'Objective 5', 'final_nn_model.pkl'), "NN Model"),
-    "job_skill_matrix": safe_load(os.path.join(MODELS_DIR, 'Objective 5', 'job_skill_matrix.pkl'), "Skill Matrix"),
-    "svd": safe_load(os.path.join(MODELS_DIR, 'Objective 5', 'svd_transformer.pkl'), "SVD"),
-    "recommender_scaler": safe_load(os.path.join(MODELS_DIR, 'Objective 5', 'scaler.pkl'), "Rec Scaler"),
-}
+    "job_recommender": _model("NN Model", 'Objective 5', 'final_nn_model.pkl'),
+    "job_skill_matrix": _model("Skill Matrix", 'Objective 5', 'job_skill_matrix.pkl'),
+    "svd": _model("SVD", 'Objective 5', 'svd_transformer.pkl'),
+    "recommender_scaler": _model("Rec Scaler", 'Objective 5', 'scaler.pkl'),
+}, sources={
+    # Array-backed artifacts shared between workers when MODEL_MMAP_DIR is set
+    "job_skill_matrix": os.path.join(MODELS_DIR, 'Objective 5', 'job_skill_matrix.pkl'),
+    "svd": os.path.join(MODELS_DIR, 'Objective 5', 'svd_transformer.pkl'),
+    "pca": os.path.join(MODELS_DIR, 'Objective 3', 'pca_transformer.pkl'),
+    "kmeans": os.path.join(MODELS_DIR, 'Objective 3', 'final_kmeans_pca_model.pkl'),
+})
 
 # =====================================================
 # LOAD DATASET
 # =====================================================
+DATASET_PATH = os.path.join(DATA_DIR, 'job_postings.csv')
+# Seconds between checks of job_postings.csv for changes (0 disables the refresher)
+DATASET_POLL_S = float(os.environ.get("SIRINE_DATASET_POLL", "60"))
+
+# Served by /available-skills/ and /job-titles/ when there is no dataset
+FALLBACK_SKILLS = ['Python', 'SQL', 'Machine Learning']
+FALLBACK_JOB_TITLES = ['Data Scientist', 'ML Engineer']
+
 def load_dataset():
+    # String columns are categoricals and the CSV is parsed only when the
+    # columnar cache next to it is missing or stale (see dataset_cache.py)
     try:
-        path = os.path.join(DATA_DIR, 'job_postings.csv')
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            df['Job_Posted_Date'] = pd.to_datetime(df['Job_Posted_Date'])
-            print(f"✓ Dataset loaded from {path}")
-            return df
-        return None
+        if os.path.exists(DATASET_PATH):
+            df, cached = load_csv_columnar(DATASET_PATH, date_columns=['Job_Posted_Date'])
+            print(f"✓ Dataset loaded from {DATASET_PATH}" + (" (columnar cache)" if cached else ""))
+            return df, cached
+        return None, False
     except Exception as e:
         print(f"✗ Dataset loading error: {e}")
-        return None
+        return None, False
+
+def build_snapshot(version=1):
+    """The dataset and every index derived from it, built together (see refresher.py)."""
+    t0 = time.perf_counter()
+    stamp = current_stamp(DATASET_PATH)
+    dataset, cached = load_dataset()
+    indexes = {
+        'skills': Vocabulary(FALLBACK_SKILLS),
+        'job_titles': Vocabulary(FALLBACK_JOB_TITLES),
+    }
+    if dataset is not None:
+        # Monthly counts per skill / country / title and sparse posting x skill /
+        # title x skill matrices (see indexes.py)
+        indexes['time_index'] = TimeSeriesIndex(dataset)
+        if indexes['time_index'].countries is not None:
+            indexes['country_trends'] = CountryTrends(indexes['time_index'].countries)
+        indexes['skill_index'] = SkillIndex(dataset)
+        if 'Skill_Name' in dataset.columns:
+            indexes['skills'] = Vocabulary(sorted(dataset['Skill_Name'].dropna().unique().tolist()))
+        if 'job_title_short' in dataset.columns:
+            indexes['job_titles'] = Vocabulary(sorted(dataset['job_title_short'].dropna().unique().tolist()))
+    return DatasetSnapshot(version, stamp, dataset, indexes, cached, time.perf_counter() - t0)
+
+_DATASET = registry.register("sirine.dataset", build_snapshot)
+_REFRESHER = DatasetRefresher(_DATASET, DATASET_PATH, build_snapshot, DATASET_POLL_S)
+
+@router.on_event("startup")
+def start_dataset_refresher():
+    _REFRESHER.start()
+
+def get_snapshot():
+    return _DATASET.get()
+
+# A request takes the snapshot once and hands it to every helper below, so a
+# refresh that lands mid-request can't mix two dataset versions in one response
+def get_dataset(snapshot):
+    return snapshot.dataset
 
-DATASET = load_dataset()
+def get_time_index(snapshot):
+    return snapshot.indexes.get('time_index')
+
+def get_skill_index(snapshot):
+    return snapshot.indexes.get('skill_index')
+
+def get_country_trends(snapshot):
+    return snapshot.indexes.get('country_trends')
+
+def build_job_embeddings():
+    parts = [MODELS['job_skill_matrix'], MODELS['svd'], MODELS['recommender_scaler']]
+    return JobEmbeddings(*parts) if all(p is not None for p in parts) else None
+
+# Job-skill matrix projected once through svd + scaler (see indexes.py)
+_JOB_EMBEDDINGS = registry.register("sirine.job_embeddings", build_job_embeddings)
 
 # =====================================================
 # HELPER LOGIC (PORTED FROM ORIGINAL VIEWS.PY)
 # =====================================================
 
-def find_complementary_skills(user_skills, top_n=5):
-    if DATASET is None: return []
-    mask = DATASET['Skill_Name'].isin(user_skills)
-    relevant_jobs = DATASET[mask]['JobPosting_Key'].unique()
-    related_skills = DATASET[DATASET['JobPosting_Key'].isin(relevant_jobs)]
-    skill_counts = related_skills['Skill_Name'].value_counts()
-    return [str(s) for s in skill_counts.index if s not in user_skills][:top_n]
+def find_complementary_skills(snapshot, user_skills, top_n=5):
+    index = get_skill_index(snapshot)
+    if index is None: return []
+    complementary = []
+    for i in index.ranked(index.complementary_counts(user_skills)):
+        if index.skills[i] in user_skills: continue
+        complementary.append(str(index.skills[i]))
+        if len(complementary) == top_n: break
+    return complementary
 
-def detect_rising_skills(top_n=10):
-    if DATASET is None: return []
+def detect_rising_skills(snapshot, top_n=10):
+    index = get_time_index(snapshot)
+    if index is None: return []
+    skills = index.skills
+    growth, valid = skills.growth_table()
     rising = []
-    all_skills = DATASET['Skill_Name'].dropna().unique()
-    for skill in all_skills[:100]:
-        skill_df = DATASET[DATASET['Skill_Name'] == skill].copy()
-        monthly = skill_df.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
-        if len(monthly) >= 6:
-            recent_avg = float(monthly.tail(3).mean())
-            older_avg = float(monthly.head(3).mean())
-            if older_avg > 0:
-                growth = ((recent_avg - older_avg) / older_avg) * 100
-                if growth > 10:
-                    rising.append({'skill': str(skill), 'growth_rate': round(float(growth), 2)})
+    for i in range(min(100, len(skills.keys))):
+        if valid[i] and growth[i] > 10:
+            rising.append({'skill': str(skills.keys[i]), 'growth_rate': round(float(growth[i]), 2)})
     rising.sort(key=lambda x: x['growth_rate'], reverse=True)
     return rising[:top_n]
 
-def get_top_demand_skills(top_n=10):
-    if DATASET is None: return []
-    skill_counts = DATASET['Skill_Name'].value_counts().head(top_n)
+def get_top_demand_skills(snapshot, top_n=10):
+    dataset = get_dataset(snapshot)
+    if dataset is None: return []
+    skill_counts = dataset['Skill_Name'].value_counts().head(top_n)
     return [{'skill': str(skill), 'count': int(count)} for skill, count in skill_counts.items()]
 
-def analyze_skill_demand(user_skills):
-    if DATASET is None or MODELS['skill_demand'] is None: return None
+def analyze_skill_demand(snapshot, user_skills):
+    index = get_time_index(snapshot)
+    if index is None or MODELS['skill_demand'] is None: return None
     skill_stats = []
-    all_skills = DATASET['Skill_Name'].dropna().unique()
     for skill in user_skills:
-        if skill in all_skills:
-            skill_df = DATASET[DATASET['Skill_Name'] == skill].copy()
-            monthly = skill_df.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
+        if skill in index.skills:
+            monthly = index.skills.monthly(skill)
             if len(monthly) >= 3:
-                last_vals = monthly.tail(3).values
+                last_vals = monthly[-3:]
                 lag_1, lag_2 = float(last_vals[-1]), float(last_vals[-2]) if len(last_vals) >= 2 else 0
                 rolling_mean = float(np.mean(last_vals))
                 features = np.array([[lag_1, lag_2, rolling_mean, datetime.now().month, (datetime.now().month - 1) // 3 + 1]])
                 prediction = float(MODELS['skill_demand'].predict(features)[0])
-                percentage = (len(skill_df) / len(DATASET)) * 100
+                frequency = index.skills.total(skill)
+                percentage = (frequency / index.n_rows) * 100
                 skill_stats.append({
-                    'skill': str(skill), 'frequency': len(skill_df), 'percentage': round(float(percentage), 2),
+                    'skill': str(skill), 'frequency': frequency, 'percentage': round(float(percentage), 2),
                     'predicted_demand': int(prediction), 'is_rising': prediction > lag_1 * 1.05,
                     'growth_rate': round(float((prediction - lag_1) / lag_1 * 100), 2) if lag_1 > 0 else 0
                 })
     return {
-        'user_skills_analysis': skill_stats, 'complementary_skills': find_complementary_skills(user_skills),
-        'rising_skills': detect_rising_skills(), 'top_demand_skills': get_top_demand_skills()
+        'user_skills_analysis': skill_stats, 'complementary_skills': find_complementary_skills(snapshot, user_skills),
+        'rising_skills': detect_rising_skills(snapshot), 'top_demand_skills': get_top_demand_skills(snapshot)
     }
 
-def get_typical_skills_for_role(role_name):
-    if not role_name or DATASET is None: return []
+def _category_mask(column, pattern):
+    """Rows whose value contains pattern (case-insensitive), tested once per category."""
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.str.lower().str.contains(pattern, na=False).to_numpy()
+    hits = column.cat.categories.str.lower().str.contains(pattern, na=False)
+    return np.isin(column.cat.codes.to_numpy(), np.flatnonzero(hits))
+
+def get_typical_skills_for_role(snapshot, role_name):
+    dataset = get_dataset(snapshot)
+    if not role_name or dataset is None: return []
     role_lower = role_name.lower().strip()
-    matching_jobs = DATASET[DATASET['job_title_short'].str.lower().str.contains(role_lower, na=False)]
+    matching_jobs = dataset[_category_mask(dataset['job_title_short'], role_lower)]
     if matching_jobs.empty: return []
     total_postings = len(matching_jobs['JobPosting_Key'].unique())
     skill_counts = matching_jobs['Skill_Name'].value_counts()
     threshold = max(1, total_postings * 0.05)
     return [str(skill) for skill, count in skill_counts.items() if pd.notna(skill) and count >= threshold][:15]
 
-def get_ml_recommendations(user_skills, desired_role=''):
+def _ml_recommendations(embeddings, similarities, user_skills, desired_role):
+    recommendations = []
+    for idx in embeddings.top_k(similarities, 50):
+        job_title = embeddings.titles[idx]
+        if desired_role.lower() in job_title.lower(): continue
+        required_skills = embeddings.required_skills[idx]
+        matched = [s for s in required_skills if s in user_skills]
+        match_pct = (len(matched) / len(required_skills)) * 100 if required_skills else 0
+        if match_pct >= 10:
+            recommendations.append({
+                'job_title': job_title, 'similarity_score': float(similarities[idx]),
+                'match_percentage': round(float(match_pct), 1), 'required_skills': required_skills[:10],
+                'missing_skills': [s for s in required_skills if s not in user_skills][:5]
+            })
+    return recommendations[:10]
+
+def get_ml_recommendations_batch(users, desired_role=''):
+    """get_ml_recommendations for many skill lists, scored in one matrix product."""
     try:
-        job_skill_matrix = MODELS['job_skill_matrix']
-        if job_skill_matrix is None: return None
-        all_skills = job_skill_matrix.columns.tolist()
-        user_vector = np.zeros(len(all_skills))
-        for skill in user_skills:
-            if skill in all_skills: user_vector[all_skills.index(skill)] = 1
-        if not user_vector.any(): return None
-        user_vector = user_vector.reshape(1, -1)
-        user_scaled = MODELS['recommender_scaler'].transform(MODELS['svd'].transform(user_vector))
-        job_features_scaled = MODELS['recommender_scaler'].transform(MODELS['svd'].transform(job_skill_matrix.values))
-        similarities = cosine_similarity(user_scaled, job_features_scaled)[0]
-        top_indices = similarities.argsort()[-50:][::-1]
-        recommendations = []
-        for idx in top_indices:
-            job_title = str(job_skill_matrix.index[idx])
-            if desired_role.lower() in job_title.lower(): continue
-            job_skills = job_skill_matrix.iloc[idx]
-            required_skills = [str(s) for s in job_skills[job_skills > 0].index.tolist()]
-            matched = [s for s in required_skills if s in user_skills]
-            match_pct = (len(matched) / len(required_skills)) * 100 if required_skills else 0
-            if match_pct >= 10:
-                recommendations.append({
-                    'job_title': job_title, 'similarity_score': float(similarities[idx]),
-                    'match_percentage': round(float(match_pct), 1), 'required_skills': required_skills[:10],
-                    'missing_skills': [s for s in required_skills if s not in user_skills][:5]
-                })
-        return recommendations[:10]
-    except: return None
+        embeddings = _JOB_EMBEDDINGS.get()
+        if embeddings is None: return [None] * len(users)
+        X = embeddings.user_vectors(users)
+        has_skills = X.any(axis=1)
+        results = [None] * len(users)
+        if has_skills.any():
+            similarities = embeddings.similarities(X[has_skills])
+            for row, u in enumerate(np.flatnonzero(has_skills)):
+                results[u] = _ml_recommendations(embeddings, similarities[row], set(users[u]), desired_role)
+        return results
+    except: return [None] * len(users)
+
+def get_ml_recommendations(user_skills, desired_role=''):
+    return get_ml_recommendations_batch([user_skills], desired_role)[0]
 
-def get_dataset_recommendations(user_skills, desired_role=''):
-    if DATASET is None: return []
+def get_dataset_recommendations(snapshot, user_skills, desired_role=''):
+    index = get_skill_index(snapshot)
+    if index is None: return []
     user_skills_norm = {s.lower().replace(' ', '') for s in user_skills}
+    sizes = index.profile_sizes
+    with np.errstate(divide='ignore', invalid='ignore'):
+        match_pcts = index.profile_matches(user_skills_norm) / sizes * 100
+    candidates = [
+        t for t, title in enumerate(index.titles)
+        if sizes[t] and desired_role.lower() != title.lower()
+    ]
+    candidates.sort(key=lambda t: round(float(match_pcts[t]), 1), reverse=True)
     recommendations = []
-    for job_title in DATASET['job_title_short'].dropna().unique():
-        if desired_role.lower() == job_title.lower(): continue
-        job_rows = DATASET[DATASET['job_title_short'] == job_title]
-        total_postings = len(job_rows['JobPosting_Key'].unique())
-        skill_counts = job_rows['Skill_Name'].value_counts()
-        important = [str(s) for s, c in skill_counts.items() if pd.notna(s) and c >= total_postings * 0.1][:20]
+    for t in candidates[:15]:
+        important = index.profiles[t]
         matched = [s for s in important if s.lower().replace(' ', '') in user_skills_norm]
-        if important:
-            match_pct = (len(matched) / len(important)) * 100
-            recommendations.append({
-                'job_title': str(job_title), 'similarity_score': match_pct/100, 'match_percentage': round(match_pct, 1),
-                'required_skills': important[:15], 'missing_skills': [s for s in important if s not in matched][:8],
-                'matched_skills_count': len(matched), 'total_required_skills': len(important)
-            })
-    return sorted(recommendations, key=lambda x: x['match_percentage'], reverse=True)[:15]
+        match_pct = float(match_pcts[t])
+        recommendations.append({
+            'job_title': str(index.titles[t]), 'similarity_score': match_pct/100, 'match_percentage': round(match_pct, 1),
+            'required_skills': important[:15], 'missing_skills': [s for s in important if s not in matched][:8],
+            'matched_skills_count': len(matched), 'total_required_skills': len(important)
+        })
+    return recommendations
 
-def recommend_jobs(user_skills, desired_role=''):
-    typical = get_typical_skills_for_role(desired_role)
+def recommend_jobs(snapshot, user_skills, desired_role=''):
+    typical = get_typical_skills_for_role(snapshot, desired_role)
     combined = list(set(user_skills) | set(typical))
     ml_rec = get_ml_recommendations(combined, desired_role)
-    return ml_rec if ml_rec else get_dataset_recommendations(combined, desired_role)
+    return ml_rec if ml_rec else get_dataset_recommendations(snapshot, combined, desired_role)
 
-def get_cluster_skill_recommendations(cluster_id, user_skills):
-    if DATASET is None: return None
+def get_cluster_skill_recommendations(snapshot, cluster_id, user_skills):
+    index = get_skill_index(snapshot)
+    if index is None: return None
     user_skills_norm = {s.lower().replace(' ', '') for s in user_skills}
-    jobs_with_user_skills = DATASET[DATASET['Skill_Name'].isin(user_skills)]
-    if jobs_with_user_skills.empty: return None
-    job_titles = jobs_with_user_skills['job_title_short'].dropna().unique()
-    cluster_jobs = DATASET[DATASET['job_title_short'].isin(job_titles)]
-    skill_counts = cluster_jobs['Skill_Name'].value_counts()
+    title_hits = index.title_counts(user_skills)
+    if not title_hits.any(): return None
+    skill_counts, cluster_rows = index.cluster_counts(title_hits)
     recommended = []
-    for skill, count in skill_counts.items():
-        if pd.isna(skill) or skill.lower().replace(' ', '') in user_skills_norm: continue
-        pct = (count / len(cluster_jobs)) * 100
+    for i in index.ranked(skill_counts):
+        skill = index.skills[i]
+        if skill.lower().replace(' ', '') in user_skills_norm: continue
+        pct = (skill_counts[i] / cluster_rows) * 100
         if pct >= 3: recommended.append({'skill': str(skill), 'percentage_of_cluster_jobs': round(float(pct), 1)})
     return {
-        'cluster_id': int(cluster_id), 'cluster_name': f'Job Family: {str(jobs_with_user_skills["job_title_short"].value_counts().index[0])}',
+        'cluster_id': int(cluster_id), 'cluster_name': f'Job Family: {str(index.titles[int(title_hits.argmax())])}',
         'recommended_skills': sorted(recommended, key=lambda x: x['percentage_of_cluster_jobs'], reverse=True)[:15]
     }
 
-def analyze_skill_cluster(user_skills):
-    if DATASET is None or MODELS['kmeans'] is None: return None
+def analyze_skill_cluster(snapshot, user_skills):
+    index = get_time_index(snapshot)
+    if index is None or MODELS['kmeans'] is None: return None
     l1, l2, rm = [], [], []
     for skill in user_skills:
-        df = DATASET[DATASET['Skill_Name'] == skill]
-        if df.empty: continue
-        monthly = df.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
+        monthly = index.skills.monthly(skill)
         if len(monthly) >= 3:
-            vals = monthly.tail(3).values
+            vals = monthly[-3:]
             l1.append(vals[-1]); l2.append(vals[-2]); rm.append(np.mean(vals))
     if not l1: return None
     feat = pd.DataFrame([{'lag_1': np.mean(l1), 'lag_2': np.mean(l2), 'rolling_mean': np.mean(rm), 'month': datetime.now().month, 'quarter': (datetime.now().month-1)//3+1}])
     cluster_id = MODELS['kmeans'].predict(MODELS['pca'].transform(MODELS['cluster_scaler'].transform(feat)))[0]
-    return get_cluster_skill_recommendations(cluster_id, user_skills)
-
-def get_global_trends():
-    if DATASET is None or 'CountryName' not in DATASET.columns: return None
-    trends = []
-    for country in DATASET['CountryName'].dropna().unique()[:100]:
-        df = DATASET[DATASET['CountryName'] == country].copy()
-        if len(df) < 100: continue
-        monthly = df.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
-        if len(monthly) >= 6:
-            rec, old = float(monthly.tail(3).mean()), float(monthly.head(3).mean())
-            if old > 0: trends.append({'country': str(country), 'percent_change': round(((rec-old)/old)*100, 2), 'job_count': len(df)})
-    trends.sort(key=lambda x: x['percent_change'], reverse=True)
-    return {'top_growing': trends[:10], 'top_declining': trends[-10:], 'all_countries': trends}
-
-def analyze_market_trends(location, desired_role):
-    if DATASET is None: return None
-    global_t = get_global_trends()
-    res = {'global_trends': global_t}
-    if location and MODELS['country_growth'] is not None:
-        country_jobs = DATASET[DATASET['CountryName'].str.contains(location, case=False, na=False)]
-        if not country_jobs.empty:
-            monthly = country_jobs.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
-            if len(monthly) >= 3:
-                vals = monthly.tail(3).values
-                feat = np.array([[float(vals[-1]), float(vals[-2]), float(np.mean(vals)), datetime.now().month, (datetime.now().month-1)//3+1]])
-                pred = float(MODELS['country_growth'].predict(feat)[0])
-                growth = ((pred - vals[-1]) / vals[-1] * 100) if vals[-1] > 0 else 0
-                rank = next((i+1 for i, c in enumerate(global_t['all_countries']) if location.lower() in c['country'].lower()), None)
-                res['location_specific'] = {'country': location, 'growth_rate': f"{round(growth, 2)}%", 'market_size': len(country_jobs), 'global_rank': rank}
+    return get_cluster_skill_recommendations(snapshot, cluster_id, user_skills)
+
+def get_global_trends(snapshot):
+    trends = get_country_trends(snapshot)
+    return trends.table if trends is not None else None
+
+def analyze_market_trends(snapshot, location, desired_role):
+    if get_dataset(snapshot) is None: return None
+    trends = get_country_trends(snapshot)
+    res = {'global_trends': trends.table if trends is not None else None}
+    if location and MODELS['country_growth'] is not None and trends is not None:
+        monthly, market_size, rank = trends.location(location)
+        if market_size and len(monthly) >= 3:
+            vals = monthly[-3:]
+            feat = np.array([[float(vals[-1]), float(vals[-2]), float(np.mean(vals)), datetime.now().month, (datetime.now().month-1)//3+1]])
+            pred = float(MODELS['country_growth'].predict(feat)[0])
+            growth = ((pred - vals[-1]) / vals[-1] * 100) if vals[-1] > 0 else 0
+            res['location_specific'] = {'country': location, 'growth_rate': f"{round(growth, 2)}%", 'market_size': market_size, 'global_rank': rank}
     return res
 
-def predict_career_forecast(desired_role, user_skills):
-    if not desired_role or DATASET is None or MODELS['job_trend'] is None: return None
-    match = next((t for t in DATASET['job_title_short'].unique() if desired_role.lower() in t.lower()), None)
-    if not match: return None
-    df = DATASET[DATASET['job_title_short'] == match]
-    monthly = df.groupby(pd.Grouper(key='Job_Posted_Date', freq='ME')).size()
-    if len(monthly) >= 3:
-        try: encoded = MODELS['job_title_encoder'].transform([match])[0]
-        except: encoded = 0
-        vals = monthly.tail(3).values
-        feat = np.array([[encoded, datetime.now().month, (datetime.now().month-1)//3+1, float(vals[-1]), float(vals[-2]), float(np.mean(vals))]])
-        pred = float(MODELS['job_trend'].predict(MODELS['job_trend_scaler'].transform(feat))[0])
+def _encode_titles(titles):
+    try: return np.asarray(MODELS['job_title_encoder'].transform(titles))
+    except:
+        encoded = []
+        for title in titles:
+            try: encoded.append(MODELS['job_title_encoder'].transform([title])[0])
+            except: encoded.append(0)
+        return np.asarray(encoded)
+
+def forecast_titles(snapshot, titles):
+    """job_trend forecasts for many titles: one feature matrix, one scaler + model call."""
+    index = get_time_index(snapshot)
+    if index is None or MODELS['job_trend'] is None: return []
+    series = [(t, index.titles.monthly(t)) for t in titles]
+    series = [(t, m[-3:]) for t, m in series if len(m) >= 3]
+    if not series: return []
+    names = [t for t, _ in series]
+    last = np.array([v for _, v in series], dtype=np.float64)
+    now = datetime.now()
+    feat = np.column_stack([
+        _encode_titles(names), np.full(len(names), now.month), np.full(len(names), (now.month-1)//3+1),
+        last[:, 2], last[:, 1], last.mean(axis=1)
+    ])
+    preds = MODELS['job_trend'].predict(MODELS['job_trend_scaler'].transform(feat))
+    forecasts = []
+    for name, vals, pred in zip(names, last, preds):
+        pred = float(pred)
         growth = ((pred - vals[-1]) / vals[-1] * 100) if vals[-1] > 0 else 0
-        return {'job_title': str(match), 'growth_trend': round(growth, 2), 'forecast_period': 'Next 3 months', 'current_postings': int(vals[-1]), 'predicted_postings': int(pred)}
-    return None
+        forecasts.append({'job_title': str(name), 'growth_trend': round(growth, 2), 'forecast_period': 'Next 3 months', 'current_postings': int(vals[-1]), 'predicted_postings': int(pred)})
+    return forecasts
+
+def predict_career_forecast(snapshot, desired_role, user_skills):
+    index = get_time_index(snapshot)
+    if not desired_role or index is None or MODELS['job_trend'] is None: return None
+    match = index.titles.find(desired_role)
+    if not match: return None
+    forecasts = forecast_titles(snapshot, [match])
+    return forecasts[0] if forecasts else None
 
 # =====================================================
 # ENDPOINTS
 # =====================================================
 
+@router.get("/dataset-status")
+async def dataset_status():
+    return {
+        **(_DATASET.get().status() if _DATASET.loaded else {"version": None, "rows": None}),
+        "loaded": _DATASET.loaded,
+        "path": DATASET_PATH,
+        "refresher": _REFRESHER.status(),
+    }
+
+# Both lists only change with the dataset: clients revalidate with If-None-Match
+LIST_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match against our (strong) ETag, with the weak comparison RFC 9110 uses for it."""
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+def _vocabulary_response(request, name, q, limit, match):
+    snapshot = get_snapshot()
+    vocabulary = snapshot.indexes[name]
+    etag = f'"{snapshot.etag}-{name}"'
+    headers = {"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if q is None and limit is None:
+        body = vocabulary.json
+    else:
+        search = vocabulary.contains if match == 'contains' else vocabulary.search
+        values = search(q or "", limit) if q is not None else vocabulary.values[:limit]
+        body = json.dumps(values).encode("utf-8")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Plain def: the first call may build the dataset snapshot, which must not block the event loop
 @router.get("/available-skills/")
-async def available_skills_api():
-    if DATASET is not None and 'Skill_Name' in DATASET.columns:
-        return sorted(DATASET['Skill_Name'].dropna().unique().tolist())
-    return ['Python', 'SQL', 'Machine Learning']
+def available_skills_api(
+    request: Request,
+    q: Optional[str] = Query(None, description="Case-insensitive prefix, e.g. ?q=py"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    match: Literal['prefix', 'contains'] = Query('prefix', description="'contains' also matches q inside a value, after the prefix matches")
+):
+    return _vocabulary_response(request, 'skills', q, limit, match)
 
 @router.get("/job-titles/")
-async def job_titles_api():
-    if DATASET is not None and 'job_title_short' in DATASET.columns:
-        return sorted(DATASET['job_title_short'].dropna().unique().tolist())
-    return ['Data Scientist', 'ML Engineer']
+def job_titles_api(
+    request: Request,
+    q: Optional[str] = Query(None, description="Case-insensitive prefix"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    match: Literal['prefix', 'contains'] = Query('prefix', description="'contains' also matches q inside a value, after the prefix matches")
+):
+    return _vocabulary_response(request, 'job_titles', q, limit, match)
+
+# Forecasting every title is CPU work: run it on the shared CPU pool, a few requests at a time
+FORECAST_LIMIT = route_limit("sirine.career_forecast_batch", 2, 8)
+
+@router.post("/career-forecast/batch")
+async def career_forecast_batch(request: CareerForecastBatchRequest):
+    return await FORECAST_LIMIT.run(_career_forecast_batch, request)
+
+def _career_forecast_batch(request):
+    snapshot = get_snapshot()
+    index = get_time_index(snapshot)
+    if index is None or MODELS['job_trend'] is None:
+        raise HTTPException(status_code=503, detail="Dataset or job trend model not available")
+    if request.roles is None:
+        titles, unmatched = list(index.titles.keys), []
+    else:
+        matches = {role: index.titles.find(role) for role in request.roles if role}
+        unmatched = [role for role, title in matches.items() if title is None]
+        titles = list(dict.fromkeys(t for t in matches.values() if t is not None))
+    forecasts = sorted(forecast_titles(snapshot, titles), key=lambda f: f['growth_trend'], reverse=True)
+    for rank, forecast in enumerate(forecasts, start=1):
+        forecast['rank'] = rank
+    return {
+        'count': len(forecasts),
+        'forecasts': forecasts[:request.top_n] if request.top_n is not None else forecasts,
+        'unmatched_roles': unmatched,
+    }
+
+# =====================================================
+# ANALYSIS FAN-OUT
+# =====================================================
+# The five sections of /analyze-skills/ are independent: they run concurrently
+# on a bounded pool, each with its own time budget. A section that fails or
+# runs out of time comes back as null and is listed under "errors"; a timed-out
+# section keeps its worker until it finishes, the request just stops waiting.
+ANALYSIS_WORKERS = int(os.environ.get("SIRINE_ANALYSIS_WORKERS", "8"))
+SECTION_TIMEOUT_S = float(os.environ.get("SIRINE_SECTION_TIMEOUT", "10"))
+
+_ANALYSIS_POOL = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="sirine-analysis")
+# Requests beyond ANALYSIS_WORKERS running + the queue are turned away with 429
+ANALYZE_LIMIT = route_limit("sirine.analyze_skills", ANALYSIS_WORKERS, 4 * ANALYSIS_WORKERS)
+
+async def _run_section(name, fn, *args):
+    loop = asyncio.get_running_loop()
+    try:
+        return name, await asyncio.wait_for(loop.run_in_executor(_ANALYSIS_POOL, fn, *args), SECTION_TIMEOUT_S), None
+    except asyncio.TimeoutError:
+        return name, None, f"timeout after {SECTION_TIMEOUT_S:g}s"
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}"
 
 @router.post("/analyze-skills/")
 async def analyze_skills(request: AnalysisRequest):
@@ -324,13 +518,22 @@ async def analyze_skills(request: AnalysisRequest):
         if not user_skills:
             raise HTTPException(status_code=400, detail="No skills provided")
 
-        result = {
-            'skill_demand_analysis': analyze_skill_demand(user_skills),
-            'job_recommendations': recommend_jobs(user_skills, desired_role),
-            'cluster_analysis': analyze_skill_cluster(user_skills),
-            'market_trends': analyze_market_trends(location, desired_role),
-            'career_forecast': predict_career_forecast(desired_role, user_skills)
-        }
+        async with ANALYZE_LIMIT.slot():
+            # One snapshot for all five sections; the first call may build it, so off the event loop
+            snapshot = await asyncio.get_running_loop().run_in_executor(_ANALYSIS_POOL, get_snapshot)
+            sections = await asyncio.gather(
+                _run_section('skill_demand_analysis', analyze_skill_demand, snapshot, user_skills),
+                _run_section('job_recommendations', recommend_jobs, snapshot, user_skills, desired_role),
+                _run_section('cluster_analysis', analyze_skill_cluster, snapshot, user_skills),
+                _run_section('market_trends', analyze_market_trends, snapshot, location, desired_role),
+                _run_section('career_forecast', predict_career_forecast, snapshot, desired_role, user_skills)
+            )
+        result = {name: value for name, value, _ in sections}
+        errors = {name: error for name, _, error in sections if error}
+        if errors:
+            result['errors'] = errors
         return result
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
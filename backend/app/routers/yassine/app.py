@@ -1,47 +1,68 @@
-from fastapi import APIRouter, UploadFile, File
+import zlib
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
 import pandas as pd
-from fastapi.responses import FileResponse
-import numpy as np
+
+from app.services.execution import route_limit
 
 # Relative import
-from .ml.pipeline import run_pipeline
-from .ml.reports import employee_table, hr_dashboard
+from .ml.pipeline import run_pipeline, iter_pipeline, CHUNKSIZE, INPUT_COLS
+from .ml.reports import employee_table, hr_dashboard, to_records, DashboardAccumulator
 
 router = APIRouter(prefix="/hr", tags=["HR"])
 
-def clean_value(val):
-    """Convert numpy/pandas types to native Python types"""
-    if isinstance(val, (np.integer, np.int64, np.int32, np.int16, np.int8)):
-        return int(val)
-    elif isinstance(val, (np.floating, np.float64, np.float32, np.float16)):
-        return float(val)
-    elif isinstance(val, np.bool_):
-        return bool(val)
-    elif isinstance(val, np.ndarray):
-        return val.tolist()
-    elif pd.isna(val):
-        return None
-    elif isinstance(val, pd.Timestamp):
-        return val.isoformat()
-    return val
+# Both routes run the whole ML pipeline: a few at a time on the CPU pool, 429 beyond the queue
+UPLOAD_LIMIT = route_limit("hr.upload", 2, 4)
+REPORT_LIMIT = route_limit("hr.report", 2, 4)
+
+CHUNKSIZE_QUERY = Query(
+    None, ge=1,
+    description="Process the CSV in batches of this many rows (bounded memory for large files)"
+)
+
+def _check_columns(source):
+    # A CSV without the pipeline's columns is a 400 here, not a KeyError halfway through scoring
+    try:
+        columns = pd.read_csv(source, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        columns = []
+    finally:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+    missing = [c for c in INPUT_COLS if c not in columns]
+    if missing:
+        raise HTTPException(status_code=400, detail={"type": "missing_columns", "columns": missing})
+
+def _analyze(source, chunksize):
+    _check_columns(source)
+    if chunksize is None:
+        df_processed = run_pipeline(pd.read_csv(source))  # Returns the processed DataFrame
+        # Serialize only the employee table columns, once
+        return hr_dashboard(df_processed), to_records(employee_table(df_processed))
+
+    dashboard, employees = DashboardAccumulator(), []
+    for chunk in iter_pipeline(source, chunksize):
+        dashboard.update(chunk)
+        employees.extend(to_records(employee_table(chunk)))
+    return dashboard.result(), employees
+
+def _report_chunks(source, chunksize, compress):
+    # CSV text chunk by chunk; gzip framing via zlib (wbits=31) so nothing is buffered whole
+    _check_columns(source)
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    for i, chunk in enumerate(iter_pipeline(source, chunksize)):
+        data = chunk.to_csv(index=False, header=i == 0).encode("utf-8")
+        if gz is not None:
+            data = gz.compress(data)
+        if data:
+            yield data
+    if gz is not None:
+        yield gz.flush()
 
 @router.post("/upload-csv")
-async def upload_and_analyze(file: UploadFile = File(...)):
-    df = pd.read_csv(file.file)
-    result = run_pipeline(df)  # Returns list of dicts
-    
-    # Convert back to DataFrame for reports
-    df_processed = pd.DataFrame(result)
-    
-    # Get dashboard (should already be clean from hr_dashboard)
-    dashboard = hr_dashboard(df_processed)
-    
-    # Get employee table
-    emp_table = employee_table(df_processed)
-    emp_dict = emp_table.to_dict(orient="records")
-    
-    # Double-check cleaning
-    emp_clean = [{k: clean_value(v) for k, v in record.items()} for record in emp_dict]
+async def upload_and_analyze(file: UploadFile = File(...), chunksize: Optional[int] = CHUNKSIZE_QUERY):
+    dashboard, emp_clean = await UPLOAD_LIMIT.run(_analyze, file.file, chunksize)
 
     return {
         "dashboard": dashboard,
@@ -49,18 +70,16 @@ async def upload_and_analyze(file: UploadFile = File(...)):
     }
 
 @router.post("/download-report")
-async def download_report(file: UploadFile = File(...)):
-    df = pd.read_csv(file.file)
-    result = run_pipeline(df)  # Returns list of dicts
-    
-    # Convert back to DataFrame for CSV export
-    df_processed = pd.DataFrame(result)
-
-    output_path = "hr_salary_report.csv"
-    df_processed.to_csv(output_path, index=False)
-
-    return FileResponse(
-        path=output_path,
-        filename="hr_salary_report.csv",
-        media_type="text/csv"
-    )
\ No newline at end of file
+async def download_report(
+    file: UploadFile = File(...),
+    chunksize: Optional[int] = CHUNKSIZE_QUERY,
+    compress: bool = Query(False, description="gzip the CSV (hr_salary_report.csv.gz)")
+):
+    # Always chunked: the report is streamed while it is computed, no file is written.
+    # The column check, model loading and first chunk run before the 200 is sent.
+    filename = "hr_salary_report.csv.gz" if compress else "hr_salary_report.csv"
+    return await REPORT_LIMIT.primed_streaming_response(
+        _report_chunks(file.file, chunksize or CHUNKSIZE, compress),
+        media_type="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
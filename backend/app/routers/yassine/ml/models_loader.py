@@ -1,13 +1,19 @@
 import joblib
 import os
 
+from app.services.model_registry import registry
+
 # This file is inside backend/app/routers/yassine/ml
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "../models")  # points to yassine/models
 
-preprocessor = joblib.load(os.path.join(MODEL_DIR, "preprocessor.joblib"))
-ensemble = joblib.load(os.path.join(MODEL_DIR, "salary_ensemble.joblib"))
-kmeans = joblib.load(os.path.join(MODEL_DIR, "kmeans_peer_groups.joblib"))
-iso_forest = joblib.load(os.path.join(MODEL_DIR, "iso_forest.joblib"))
-one_class_svm = joblib.load(os.path.join(MODEL_DIR, "one_class_svm.joblib"))
-elliptic = joblib.load(os.path.join(MODEL_DIR, "elliptic_envelope.joblib"))
\ No newline at end of file
+def _model(name, filename):
+    # Loaded on first use, not at import (see app/services/model_registry.py)
+    return registry.register(f"yassine.{name}", lambda: joblib.load(os.path.join(MODEL_DIR, filename)))
+
+preprocessor = _model("preprocessor", "preprocessor.joblib")
+ensemble = _model("salary_ensemble", "salary_ensemble.joblib")
+kmeans = _model("kmeans_peer_groups", "kmeans_peer_groups.joblib")
+iso_forest = _model("iso_forest", "iso_forest.joblib")
+one_class_svm = _model("one_class_svm", "one_class_svm.joblib")
+elliptic = _model("elliptic_envelope", "elliptic_envelope.joblib")
\ No newline at end of file
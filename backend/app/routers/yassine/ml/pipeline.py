@@ -5,7 +5,139 @@ from .models_loader import (
     iso_forest, one_class_svm, elliptic
 )
 
-def run_pipeline(df):
+# Rows per batch in chunked mode (see iter_pipeline)
+CHUNKSIZE = 50_000
+
+CLUSTER_COLS = ['years_experience', 'performance_score', 'dept_size']
+
+# Columns the group-level stages need; pass 1 of the chunked mode reads only these
+GROUP_INPUT_COLS = [
+    'employee_id', 'department', 'location', 'job_title',
+    'salary', 'years_experience', 'performance_score'
+]
+
+# Every CSV column the pipeline reads (the group columns plus the preprocessor's categorical inputs)
+INPUT_COLS = GROUP_INPUT_COLS + ['education_level', 'seniority_level', 'gender']
+
+
+class GroupStats:
+    """Dataset-wide aggregates used by the group-level stages of the pipeline."""
+
+    def __init__(self, dept_size, location_size, market_rate_title_loc, market_rate_title, cluster_mean, cluster_std):
+        self.dept_size = dept_size
+        self.location_size = location_size
+        self.market_rate_title_loc = market_rate_title_loc
+        self.market_rate_title = market_rate_title
+        self.cluster_mean = cluster_mean
+        self.cluster_std = cluster_std
+
+    @classmethod
+    def from_frame(cls, df):
+        dept_size = df.groupby('department')['employee_id'].count()
+        X_cluster = pd.DataFrame({
+            'years_experience': df['years_experience'],
+            'performance_score': df['performance_score'],
+            'dept_size': df['department'].map(dept_size),
+        })
+        return cls(
+            dept_size=dept_size,
+            location_size=df.groupby('location')['employee_id'].count(),
+            market_rate_title_loc=df.groupby(['job_title', 'location'])['salary'].median(),
+            market_rate_title=df.groupby('job_title')['salary'].median(),
+            cluster_mean=X_cluster.mean(),
+            cluster_std=X_cluster.std(),
+        )
+
+
+class _Moments:
+    """Running count/mean/M2 (Chan et al.) so std matches pandas' ddof=1 without keeping the column."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+
+class StreamingGroupStats:
+    """Builds GroupStats from a sequence of chunks.
+
+    Counts and moments are O(groups); the market medians keep one float per
+    salary (no other column), which is what an exact median needs.
+    """
+
+    def __init__(self):
+        self._dept_ids = pd.Series(dtype='int64')
+        self._dept_rows = pd.Series(dtype='int64')
+        self._location_ids = pd.Series(dtype='int64')
+        self._salaries_title_loc = {}
+        self._salaries_title = {}
+        self._moments = {c: _Moments() for c in ['years_experience', 'performance_score']}
+
+    def update(self, chunk):
+        self._dept_ids = self._dept_ids.add(chunk.groupby('department')['employee_id'].count(), fill_value=0)
+        self._dept_rows = self._dept_rows.add(chunk['department'].value_counts(), fill_value=0)
+        self._location_ids = self._location_ids.add(chunk.groupby('location')['employee_id'].count(), fill_value=0)
+        salaries = chunk.dropna(subset=['salary'])
+        for key, s in salaries.groupby(['job_title', 'location'])['salary']:
+            self._salaries_title_loc.setdefault(key, []).append(s.to_numpy(dtype=np.float64))
+        for key, s in salaries.groupby('job_title')['salary']:
+            self._salaries_title.setdefault(key, []).append(s.to_numpy(dtype=np.float64))
+        for c, m in self._moments.items():
+            m.update(chunk[c].to_numpy(dtype=np.float64))
+
+    @staticmethod
+    def _medians(groups, names):
+        med = {k: float(np.median(np.concatenate(v))) for k, v in groups.items()}
+        if len(names) > 1:
+            index = pd.MultiIndex.from_tuples(list(med), names=names)
+        else:
+            index = pd.Index(list(med), name=names[0])
+        return pd.Series(list(med.values()), index=index, name='salary', dtype='float64').sort_index()
+
+    def finalize(self):
+        dept_size = self._dept_ids.astype('int64').sort_index()
+        rows = self._dept_rows.reindex(dept_size.index).to_numpy(dtype=np.float64)
+        sizes = dept_size.to_numpy(dtype=np.float64)
+        n = rows.sum()
+        dept_mean = (rows * sizes).sum() / n if n else np.nan
+        dept_std = np.sqrt((rows * (sizes - dept_mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+        ye, ps = self._moments['years_experience'], self._moments['performance_score']
+        return GroupStats(
+            dept_size=dept_size,
+            location_size=self._location_ids.astype('int64').sort_index(),
+            market_rate_title_loc=self._medians(self._salaries_title_loc, ['job_title', 'location']),
+            market_rate_title=self._medians(self._salaries_title, ['job_title']),
+            cluster_mean=pd.Series([ye.mean if ye.n else np.nan, ps.mean if ps.n else np.nan, dept_mean], index=CLUSTER_COLS),
+            cluster_std=pd.Series([ye.std, ps.std, dept_std], index=CLUSTER_COLS),
+        )
+
+
+def _lookup(df, keys, values):
+    """Per-row value of a group aggregate; NaN when a key is missing, like groupby().transform()."""
+    if len(keys) == 1:
+        return df[keys[0]].map(values)
+    merged = df[keys].merge(values.rename('_value').reset_index(), on=keys, how='left')
+    return pd.Series(merged['_value'].to_numpy(), index=df.index)
+
+
+def add_row_features(df):
     # ---------- CREATE ADVANCED FEATURES ----------
     df['exp_performance'] = df['years_experience'] * df['performance_score']
     df['exp_squared'] = df['years_experience'] ** 2
@@ -20,69 +152,75 @@ def run_pipeline(df):
     df['exp_category'] = pd.cut(df['years_experience'],
                                 bins=[0, 2, 5, 10, 20, 50],
                                 labels=['Entry', 'Junior', 'Mid', 'Senior', 'Expert'])
+    return df
+
 
-    df['dept_size'] = df.groupby('department')['employee_id'].transform('count')
-    df['location_size'] = df.groupby('location')['employee_id'].transform('count')
+def score(df, stats):
+    """Group features from `stats`, then the per-row model stages. Works on any chunk of rows."""
+    df['dept_size'] = _lookup(df, ['department'], stats.dept_size)
+    df['location_size'] = _lookup(df, ['location'], stats.location_size)
     df['title_words'] = df['job_title'].str.split().str.len()
 
     # ---------- Salary Prediction ----------
-    if hasattr(preprocessor, "feature_names_in_"):
-        expected_cols = list(preprocessor.feature_names_in_)
+    preprocessor_m = preprocessor.get()
+    if hasattr(preprocessor_m, "feature_names_in_"):
+        expected_cols = list(preprocessor_m.feature_names_in_)
         available_cols = [c for c in expected_cols if c in df.columns]
         X = df[available_cols]
     else:
         X = df.copy()
 
-    X_transformed = preprocessor.transform(X)
-    df['predicted_salary'] = ensemble.predict(X_transformed)
-    df['market_rate_title_loc'] = df.groupby(['job_title', 'location'])['salary'].transform('median')
-    df['market_rate_title'] = df.groupby('job_title')['salary'].transform('median')
+    X_transformed = preprocessor_m.transform(X)
+    df['predicted_salary'] = ensemble.get().predict(X_transformed)
+    df['market_rate_title_loc'] = _lookup(df, ['job_title', 'location'], stats.market_rate_title_loc)
+    df['market_rate_title'] = _lookup(df, ['job_title'], stats.market_rate_title)
     df['salary_gap'] = df['salary'] - df['predicted_salary']
     df['vs_market'] = ((df['salary'] - df['market_rate_title_loc']) / df['market_rate_title_loc']) * 100
 
     # ---------- Clustering ----------
-    cluster_cols = ['years_experience', 'performance_score', 'dept_size']
-    X_cluster = df[cluster_cols].copy()
-    X_cluster = (X_cluster - X_cluster.mean()) / X_cluster.std()
-    df['peer_group'] = kmeans.predict(X_cluster)
+    X_cluster = df[CLUSTER_COLS].copy()
+    X_cluster = (X_cluster - stats.cluster_mean) / stats.cluster_std
+    df['peer_group'] = kmeans.get().predict(X_cluster)
 
     # ---------- Anomaly Detection ----------
     anomaly_features = df[['salary', 'years_experience', 'performance_score', 'salary_gap', 'vs_market']].fillna(0)
-    votes = iso_forest.predict(anomaly_features) + one_class_svm.predict(anomaly_features) + elliptic.predict(anomaly_features)
+    votes = iso_forest.get().predict(anomaly_features) + one_class_svm.get().predict(anomaly_features) + elliptic.get().predict(anomaly_features)
     df['is_anomaly'] = votes < 0
-    df['anomaly_type'] = df['salary_gap'].apply(lambda x: "Underpaid" if x < 0 else "Overpaid")
+    underpaid = (df['salary_gap'] < 0).to_numpy()
+    df['anomaly_type'] = np.where(underpaid, "Underpaid", "Overpaid").astype(object)
 
     # ---------- Retention Risk ----------
-    df['retention_risk'] = df.apply(
-        lambda r:
-            "High" if r['anomaly_type'] == "Underpaid" and r['performance_score'] >= 4
-            else "Medium" if r['salary_gap'] < 0
-            else "Low",
-        axis=1
-    )
-
-    # ---------- CONVERT TO JSON-SERIALIZABLE FORMAT ----------
-    # Convert categorical columns to string
-    for col in df.select_dtypes(include=['category']).columns:
-        df[col] = df[col].astype(str)
-    
-    # Convert to dict first
-    result = df.to_dict(orient='records')
-    
-    # Clean all numpy types
-    def clean_value(val):
-        if isinstance(val, (np.integer, np.int64, np.int32)):
-            return int(val)
-        elif isinstance(val, (np.floating, np.float64, np.float32)):
-            return float(val)
-        elif isinstance(val, np.bool_):
-            return bool(val)
-        elif isinstance(val, np.ndarray):
-            return val.tolist()
-        elif pd.isna(val):
-            return None
-        return val
-    
-    result = [{k: clean_value(v) for k, v in record.items()} for record in result]
-    
-    return result
\ No newline at end of file
+    # High: underpaid high performer, Medium: underpaid, Low: everyone else
+    high_performer = (df['performance_score'] >= 4).to_numpy()
+    df['retention_risk'] = np.select(
+        [underpaid & high_performer, underpaid],
+        ["High", "Medium"],
+        default="Low"
+    ).astype(object)
+    return df
+
+
+def run_pipeline(df):
+    df = add_row_features(df)
+    # Stays a DataFrame: serialization happens once, at the response boundary (reports.to_records)
+    return score(df, GroupStats.from_frame(df))
+
+
+def _read_chunks(source, chunksize, **kwargs):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return pd.read_csv(source, chunksize=chunksize, **kwargs)
+
+
+def iter_pipeline(source, chunksize=CHUNKSIZE):
+    """Chunked run_pipeline over a CSV path or seekable file, yielding processed chunks.
+
+    Pass 1 streams the group columns into StreamingGroupStats; pass 2 re-reads
+    the file and scores each chunk, so memory is bounded by the chunk size.
+    """
+    acc = StreamingGroupStats()
+    for chunk in _read_chunks(source, chunksize, usecols=lambda c: c in GROUP_INPUT_COLS):
+        acc.update(chunk)
+    stats = acc.finalize()
+    for chunk in _read_chunks(source, chunksize):
+        yield score(add_row_features(chunk), stats)
\ No newline at end of file
@@ -18,6 +18,36 @@ def clean_value(val):
         return val.isoformat()
     return val
 
+def deep_clean(obj):
+    """Apply clean_value recursively through dicts and lists"""
+    if isinstance(obj, dict):
+        return {k: deep_clean(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [deep_clean(item) for item in obj]
+    else:
+        return clean_value(obj)
+
+def to_records(df):
+    """Serialize a DataFrame to JSON-safe records, column by column.
+
+    NaN/NaT become None, numpy scalars become Python scalars, categoricals
+    their labels and timestamps ISO strings.
+    """
+    columns = []
+    for _, col in df.items():
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype(object)
+        missing = col.isna().to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(col.dtype):
+            values = [None if m else v.isoformat() for v, m in zip(col.tolist(), missing)]
+        else:
+            values = col.tolist()
+            for i in np.flatnonzero(missing):
+                values[i] = None
+        columns.append(values)
+    names = [str(c) for c in df.columns]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
 def hr_dashboard(df):
     """Generate dashboard metrics - returns JSON-safe dict"""
     dashboard = {
@@ -64,16 +94,87 @@ def hr_dashboard(df):
     }
     
     # Clean all values recursively
-    def deep_clean(obj):
-        if isinstance(obj, dict):
-            return {k: deep_clean(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [deep_clean(item) for item in obj]
-        else:
-            return clean_value(obj)
-    
     return deep_clean(dashboard)
 
+class DashboardAccumulator:
+    """hr_dashboard() built incrementally from processed chunks.
+
+    Keeps only sums and counts per group, so the dashboard of a chunked run
+    (pipeline.iter_pipeline) matches the one of a full in-memory run.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.totals = None
+        self.by_department = None
+        self.by_location = None
+        self.by_peer_group = None
+
+    @staticmethod
+    def _sums(df, key, columns):
+        grouped = df.groupby(key)
+        parts = {'count': grouped['employee_id'].count()}
+        for col in columns:
+            parts[col + '_sum'] = grouped[col].sum()
+            parts[col + '_n'] = grouped[col].count()
+        return pd.DataFrame(parts)
+
+    @staticmethod
+    def _add(acc, part):
+        return part if acc is None else acc.add(part, fill_value=0)
+
+    def update(self, df):
+        self.total += len(df)
+        totals = pd.Series({
+            'salary_sum': df['salary'].sum(),
+            'salary_n': df['salary'].count(),
+            'predicted_salary_sum': df['predicted_salary'].sum(),
+            'predicted_salary_n': df['predicted_salary'].count(),
+            'underpaid': (df['anomaly_type'] == 'Underpaid').sum(),
+            'overpaid': (df['anomaly_type'] == 'Overpaid').sum(),
+            'high': (df['retention_risk'] == 'High').sum(),
+            'medium': (df['retention_risk'] == 'Medium').sum(),
+            'low': (df['retention_risk'] == 'Low').sum(),
+        }, dtype='float64')
+        self.totals = self._add(self.totals, totals)
+        self.by_department = self._add(self.by_department, self._sums(df, 'department', ['salary', 'salary_gap']))
+        self.by_location = self._add(self.by_location, self._sums(df, 'location', ['salary']))
+        self.by_peer_group = self._add(self.by_peer_group, self._sums(df, 'peer_group', ['years_experience', 'performance_score']))
+        return self
+
+    @staticmethod
+    def _mean(total, n):
+        return total / n if n else np.nan
+
+    def _rows(self, table, key, cast, fields):
+        if table is None:
+            return []
+        return [
+            {
+                key: cast(label),
+                "count": int(row['count']),
+                **{name: float(self._mean(row[col + '_sum'], row[col + '_n'])) for name, col in fields.items()}
+            }
+            for label, row in table.sort_index().iterrows()
+        ]
+
+    def result(self):
+        t = self.totals if self.totals is not None else pd.Series(dtype='float64')
+        dashboard = {
+            "total_employees": int(self.total),
+            "avg_salary": float(self._mean(t.get('salary_sum', 0), t.get('salary_n', 0))),
+            "avg_predicted_salary": float(self._mean(t.get('predicted_salary_sum', 0), t.get('predicted_salary_n', 0))),
+            "total_underpaid": int(t.get('underpaid', 0)),
+            "total_overpaid": int(t.get('overpaid', 0)),
+            "high_risk_count": int(t.get('high', 0)),
+            "medium_risk_count": int(t.get('medium', 0)),
+            "low_risk_count": int(t.get('low', 0)),
+            "by_department": self._rows(self.by_department, "department", str, {"avg_salary": 'salary', "avg_gap": 'salary_gap'}),
+            "by_location": self._rows(self.by_location, "location", str, {"avg_salary": 'salary'}),
+            "by_peer_group": self._rows(self.by_peer_group, "peer_group", int, {"avg_experience": 'years_experience', "avg_performance": 'performance_score'}),
+        }
+        return deep_clean(dashboard)
+
 def employee_table(df):
     """Return employee table as DataFrame"""
     # Select relevant columns
@@ -0,0 +1,155 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Upper bounds shared by every predict batcher; override per process with
+# BATCH_MAX_SIZE (rows) and BATCH_MAX_WAIT_MS. A wait of 0 still coalesces
+# requests that are already queued, it just never sleeps for more.
+MAX_BATCH = int(os.getenv("BATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+
+
+def stack_rows(items):
+    """Concatenate single-request inputs (DataFrames, arrays or sparse rows) into one matrix."""
+    first = items[0]
+    if isinstance(first, pd.DataFrame):
+        return pd.concat(items, ignore_index=True)
+    if sp.issparse(first):
+        return sp.vstack(items, format="csr")
+    return np.vstack([np.atleast_2d(np.asarray(x)) for x in items])
+
+
+def n_rows(item):
+    return item.shape[0] if hasattr(item, "shape") and len(item.shape) > 1 else 1
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions for one model.
+
+    Callers submit their own feature matrix; the worker thread waits up to
+    max_wait_ms (or until max_batch rows are queued), stacks everything with
+    stack_rows, runs fn once and hands each caller back its slice of the result.
+    fn(X) must return one output per input row. If a batch fails, its requests
+    are retried one by one so a bad row only fails its own caller.
+    """
+
+    def __init__(self, name, fn, max_batch=None, max_wait_ms=None):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max_batch or MAX_BATCH
+        self.max_wait = (MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_batch_seen = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def submit(self, X) -> Future:
+        fut = Future()
+        self._queue.put((X, n_rows(X), time.monotonic(), fut))
+        with self._lock:
+            self._ensure_worker()
+        return fut
+
+    def __call__(self, X):
+        """Blocking predict for X; meant for sync endpoints (run in the threadpool)."""
+        return self.submit(X).result()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=f"batch-{self.name}", daemon=True)
+            self._worker.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        rows = batch[0][1]
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            left = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=left) if left > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += item[1]
+        return batch, rows
+
+    def _predict(self, batch):
+        out = self.fn(stack_rows([x for x, _, _, _ in batch]))
+        start, parts = 0, []
+        for _, n, _, _ in batch:
+            parts.append(out[start:start + n])
+            start += n
+        return parts
+
+    def _run(self):
+        while True:
+            batch, rows = self._collect()
+            started = time.monotonic()
+            waits = [started - queued for _, _, queued, _ in batch]
+            try:
+                results = [(fut, part, None) for (_, _, _, fut), part in zip(batch, self._predict(batch))]
+            except Exception:
+                results = []
+                for item in batch:
+                    try:
+                        results.append((item[3], self._predict([item])[0], None))
+                    except Exception as e:
+                        results.append((item[3], None, e))
+            with self._lock:
+                self.requests += len(batch)
+                self.rows += rows
+                self.batches += 1
+                self.max_batch_seen = max(self.max_batch_seen, rows)
+                self.wait_total += sum(waits)
+                self.wait_max = max(self.wait_max, *waits)
+                self.errors += sum(1 for _, _, e in results if e is not None)
+            for fut, part, e in results:
+                if e is not None:
+                    fut.set_exception(e)
+                else:
+                    fut.set_result(part)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "requests": self.requests,
+                "rows": self.rows,
+                "batches": self.batches,
+                "errors": self.errors,
+                "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "avg_queue_wait_ms": round(self.wait_total / self.requests * 1000.0, 3) if self.requests else 0.0,
+                "max_queue_wait_ms": round(self.wait_max * 1000.0, 3),
+            }
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def batcher(name, fn, **kwargs) -> MicroBatcher:
+    """Return the shared batcher for `name`, creating it on first call."""
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(name, fn, **kwargs)
+        return _batchers[name]
+
+
+def batching_status():
+    with _batchers_lock:
+        items = list(_batchers.items())
+    return {name: b.stats() for name, b in sorted(items)}
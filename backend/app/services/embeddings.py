@@ -0,0 +1,125 @@
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.batching import batcher
+from app.services.model_registry import registry
+
+MAX_BATCH = 64
+MAX_WAIT_MS = 5
+CACHE_SIZE = 4096
+
+
+def normalize_text(text) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+class EmbeddingService:
+    """Process-wide SentenceTransformer shared by every caller of the same model.
+
+    encode() answers from an LRU cache keyed by the normalized text and sends
+    only the misses to a MicroBatcher (app/services/batching.py), which merges
+    concurrent callers into one forward pass. A text already being encoded for
+    another caller is waited for, not encoded twice.
+    """
+
+    def __init__(self, name, path, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, cache_size=CACHE_SIZE):
+        self.name = name
+        self.path = path
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self._model = registry.register(name, self._load)
+        self._batcher = batcher(name, self._encode_batch, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self._cache = OrderedDict()
+        self._pending = {}  # text -> (future of its encode request, row in that request)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(self.path)
+
+    def model(self):
+        return self._model.get()
+
+    def _encode_batch(self, X):
+        # X: one text per row, the misses of every request in the batch
+        return np.asarray(
+            self.model().encode(list(X[:, 0]), batch_size=self.max_batch, show_progress_bar=False),
+            dtype=np.float32,
+        )
+
+    def encode(self, texts) -> np.ndarray:
+        keys = [normalize_text(t) for t in texts]
+        found, waits, missing = {}, {}, []
+        with self._lock:
+            for k in keys:
+                if k in found or k in waits:
+                    continue
+                if k in self._cache:
+                    self._cache.move_to_end(k)
+                    found[k] = self._cache[k]
+                    self.hits += 1
+                elif k in self._pending:
+                    waits[k] = self._pending[k]
+                    self.hits += 1
+                else:
+                    missing.append(k)
+                    waits[k] = None
+                    self.misses += 1
+            if missing:
+                fut = self._batcher.submit(np.array(missing, dtype=object).reshape(-1, 1))
+                for i, k in enumerate(missing):
+                    self._pending[k] = waits[k] = (fut, i)
+        if missing:
+            # Outside the lock: the callback runs right here if the batch is already done
+            fut.add_done_callback(lambda f: self._store(missing, f))
+        for k, (fut, i) in waits.items():
+            found[k] = fut.result()[i]
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[k] for k in keys]).astype(np.float32, copy=False)
+
+    def _store(self, keys, fut):
+        with self._lock:
+            for k in keys:
+                self._pending.pop(k, None)
+            if fut.exception() is not None:
+                return
+            for k, v in zip(keys, fut.result()):
+                self._cache[k] = v
+                self._cache.move_to_end(k)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self):
+        # Batch sizes and queue waits are under this name in /models/batching
+        with self._lock:
+            return {
+                "model_loaded": self._model.loaded,
+                "cache_size": len(self._cache),
+                "cache_capacity": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def embedding_service(name, path) -> EmbeddingService:
+    """Return the shared service for `name`, creating it on first call."""
+    with _services_lock:
+        if name not in _services:
+            _services[name] = EmbeddingService(name, path)
+        return _services[name]
+
+
+def embeddings_status():
+    with _services_lock:
+        items = list(_services.items())
+    return {name: service.stats() for name, service in sorted(items)}
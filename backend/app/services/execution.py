@@ -0,0 +1,191 @@
+import os
+import asyncio
+import functools
+import itertools
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+# CPU-heavy handlers (CSV pipelines, batch scoring, dataset scans) run on this
+# pool instead of the event loop, so light endpoints keep answering while they
+# work. A thread pool rather than a process pool: the models live in this
+# process (app/services/model_registry.py) and numpy/sklearn release the GIL in
+# their hot loops.
+CPU_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(8, os.cpu_count() or 4))))
+
+# Per-route overrides, e.g. ROUTE_LIMITS="hr.upload=2/4,sirine.analyze=8/32":
+# at most 2 uploads running at once, 4 more waiting, the rest get a 429.
+LIMITS_ENV = "ROUTE_LIMITS"
+
+_CPU_POOL = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+
+
+def _env_limits():
+    limits = {}
+    for part in os.getenv(LIMITS_ENV, "").split(","):
+        name, _, value = part.strip().partition("=")
+        if not value:
+            continue
+        concurrent, _, waiting = value.partition("/")
+        try:
+            limits[name.strip()] = (int(concurrent), int(waiting or 0))
+        except ValueError:
+            print(f"✗ Ignoring invalid {LIMITS_ENV} entry: {part!r}")
+    return limits
+
+
+class RouteLimit:
+    """Concurrency limit + bounded wait queue for one route (or group of routes).
+
+    Up to max_concurrent requests hold a slot; up to max_queue more wait for
+    one; anything beyond that is rejected at once with 429 instead of piling up.
+    Counters are only touched from the event loop, so no lock is needed.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def check(self):
+        """Raise the 429 now if every slot and queue place is taken."""
+        if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail={"type": "busy", "route": self.name, "max_concurrent": self.max_concurrent, "max_queue": self.max_queue},
+                headers={"Retry-After": "1"},
+            )
+
+    async def acquire(self):
+        """Wait for a slot (429 if the queue is full too); returns its release(), safe to call twice."""
+        self.check()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.active -= 1
+                self.completed += 1
+                self._slots.release()
+        return release
+
+    @asynccontextmanager
+    async def slot(self):
+        release = await self.acquire()
+        try:
+            yield
+        finally:
+            release()
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) on the CPU pool, holding one of this route's slots."""
+        async with self.slot():
+            return await run_cpu(fn, *args, **kwargs)
+
+    async def streaming_response(self, content, response_class=None, **kwargs):
+        """StreamingResponse for content, holding a slot taken before it is returned.
+
+        The wait and any 429 happen before the status line is sent; the slot is
+        released when the response ends, however it ends (see LimitedStreamingResponse).
+        """
+        release = await self.acquire()
+        return (response_class or LimitedStreamingResponse)(content, release, **kwargs)
+
+    async def primed_streaming_response(self, iterator, **kwargs):
+        """streaming_response for a blocking iterator, its first item computed before returning.
+
+        Holding the slot, the first next() runs on the CPU pool: an exception
+        up to that item (bad input, a model that won't load) is raised here and
+        becomes the usual error response, not a 200 with an empty body.
+        """
+        release = await self.acquire()
+        try:
+            first = await run_cpu(next, iterator, _DONE)
+        except BaseException:
+            release()
+            raise
+        content = iterate_cpu(iter(()) if first is _DONE else itertools.chain([first], iterator))
+        return LimitedStreamingResponse(content, release, **kwargs)
+
+    def status(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+async def run_cpu(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_CPU_POOL, functools.partial(fn, *args, **kwargs))
+
+
+_DONE = object()
+
+
+async def iterate_cpu(iterator):
+    """Drain a blocking iterator on the CPU pool, e.g. as StreamingResponse content."""
+    while True:
+        item = await run_cpu(next, iterator, _DONE)
+        if item is _DONE:
+            break
+        yield item
+
+
+class LimitedStreamingResponse(StreamingResponse):
+    """StreamingResponse that releases a RouteLimit slot when it ends.
+
+    Released here rather than in the body generator: a generator that never
+    started (client gone before the first byte) would never run its finally.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+_limits = {}
+_limits_lock = threading.Lock()
+
+
+def route_limit(name, max_concurrent, max_queue) -> RouteLimit:
+    """Return the shared limit for `name`; ROUTE_LIMITS overrides the defaults given here."""
+    with _limits_lock:
+        if name not in _limits:
+            max_concurrent, max_queue = _env_limits().get(name, (max_concurrent, max_queue))
+            _limits[name] = RouteLimit(name, max_concurrent, max_queue)
+        return _limits[name]
+
+
+def execution_status():
+    with _limits_lock:
+        items = list(_limits.items())
+    return {
+        "cpu_workers": CPU_WORKERS,
+        "routes": {name: limit.status() for name, limit in sorted(items)},
+    }
@@ -0,0 +1,258 @@
+import os
+import gc
+import time
+import fnmatch
+import threading
+from collections.abc import Mapping
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+# Comma separated artifact names (fnmatch patterns allowed, e.g. "ahmed.*")
+# that are loaded in the background as soon as the app starts.
+WARMUP_ENV = "MODEL_WARMUP"
+
+# Same syntax, but loaded synchronously while app.main is imported. Under a
+# server that imports the app once and then forks its workers (gunicorn
+# --preload -k uvicorn.workers.UvicornWorker), the workers share these
+# artifacts copy-on-write instead of each unpickling its own copy.
+PRELOAD_ENV = "MODEL_PRELOAD"
+
+# Directory for memory-mapped copies of artifacts registered with a source
+# file: they are re-saved there uncompressed once and loaded back with joblib
+# mmap_mode="r", so their NumPy arrays sit in the OS page cache and are shared
+# by every worker process, forked or spawned (uvicorn --workers).
+MMAP_DIR_ENV = "MODEL_MMAP_DIR"
+
+
+def _rss():
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(os.getpid()).memory_info().rss
+    except Exception:
+        return None
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def load_mmap(name, source, loader, cache_dir):
+    """loader() through an uncompressed joblib copy in cache_dir, opened with mmap_mode="r".
+
+    The copy is rewritten when `source` (a path, or a list of paths for an
+    artifact derived from several files) changes size or mtime. Arrays of the
+    returned object are read-only memmaps; anything that cannot be dumped is
+    returned as loaded.
+    """
+    import joblib
+
+    path = os.path.join(cache_dir, f"{name}.joblib")
+    stamp_path = path + ".stamp"
+    sources = [source] if isinstance(source, str) else list(source)
+    stamp = "|".join(_file_stamp(p) for p in sources) if all(os.path.exists(p) for p in sources) else None
+    try:
+        with open(stamp_path, encoding="utf-8") as f:
+            fresh = stamp is not None and f.read() == stamp and os.path.exists(path)
+    except OSError:
+        fresh = False
+    if not fresh:
+        value = loader()
+        if value is None or stamp is None:
+            return value
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Data first, stamp last: a matching stamp always means a complete copy
+            tmp = f"{path}.tmp-{os.getpid()}"
+            joblib.dump(value, tmp)
+            os.replace(tmp, path)
+            with open(f"{stamp_path}.tmp-{os.getpid()}", "w", encoding="utf-8") as f:
+                f.write(stamp)
+            os.replace(f"{stamp_path}.tmp-{os.getpid()}", stamp_path)
+        except Exception as e:
+            print(f"✗ Not memory-mapping {name}: {e}")
+            return value
+    return joblib.load(path, mmap_mode="r")
+
+
+class LazyArtifact:
+    """An artifact that is only loaded the first time get() is called."""
+
+    def __init__(self, name, loader, source=None):
+        self.name = name
+        self._loader = loader
+        self.source = source  # file(s) the loader reads; enables MODEL_MMAP_DIR sharing
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.load_seconds = None
+        self.rss_delta_bytes = None
+        self.loaded_at = None
+        self.error = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if self._loaded:
+                return self._value
+            rss0 = _rss()
+            t0 = time.perf_counter()
+            try:
+                value = self._load()
+            except Exception as e:
+                # Not cached: the next call retries the load.
+                self.error = f"{type(e).__name__}: {e}"
+                raise
+            self.load_seconds = time.perf_counter() - t0
+            rss1 = _rss()
+            self.rss_delta_bytes = rss1 - rss0 if rss0 is not None and rss1 is not None else None
+            self.loaded_at = time.time()
+            self.error = None
+            self._value = value
+            self._loaded = True
+            return value
+
+    def _load(self):
+        cache_dir = os.environ.get(MMAP_DIR_ENV)
+        if cache_dir and self.source is not None:
+            return load_mmap(self.name, self.source, self._loader, cache_dir)
+        return self._loader()
+
+    def replace(self, value, load_seconds=None):
+        """Swap in a value built elsewhere (e.g. a background refresh).
+
+        Nothing is loaded here: load_seconds is the caller's build time if it
+        has one, the RSS delta is unknown and loaded_at is the swap time.
+        """
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self.load_seconds = load_seconds
+            self.rss_delta_bytes = None
+            self.loaded_at = time.time()
+            self.error = None
+
+    def reset(self):
+        """Drop the cached value, and what status() knew about its load, so the next get() reloads it."""
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.load_seconds = None
+            self.rss_delta_bytes = None
+            self.loaded_at = None
+            self.error = None
+
+    def status(self):
+        return {
+            "loaded": self._loaded,
+            "load_seconds": round(self.load_seconds, 4) if self.load_seconds is not None else None,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "loaded_at": self.loaded_at,
+            "mmap": bool(self.source is not None and os.environ.get(MMAP_DIR_ENV)),
+            "error": self.error,
+        }
+
+
+class LazyGroup(Mapping):
+    """Dict-like view over several artifacts, each loaded on first access."""
+
+    def __init__(self, artifacts):
+        self._artifacts = artifacts
+
+    def __getitem__(self, key):
+        return self._artifacts[key].get()
+
+    def __iter__(self):
+        return iter(self._artifacts)
+
+    def __len__(self):
+        return len(self._artifacts)
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, source=None):
+        with self._lock:
+            if name in self._artifacts:
+                return self._artifacts[name]
+            art = LazyArtifact(name, loader, source)
+            self._artifacts[name] = art
+            return art
+
+    def group(self, prefix, loaders, sources=None):
+        sources = sources or {}
+        return LazyGroup({k: self.register(f"{prefix}.{k}", fn, sources.get(k)) for k, fn in loaders.items()})
+
+    def get(self, name):
+        return self._artifacts[name].get()
+
+    def names(self):
+        return list(self._artifacts)
+
+    def match(self, patterns):
+        return [n for n in self._artifacts if any(fnmatch.fnmatchcase(n, p) for p in patterns)]
+
+    def warmup(self, patterns):
+        """Load every artifact matching one of the patterns, collecting errors."""
+        errors = {}
+        for name in self.match(patterns):
+            try:
+                self._artifacts[name].get()
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+        return errors
+
+    def warmup_from_env(self, background=True):
+        raw = os.environ.get(WARMUP_ENV, "")
+        patterns = [p.strip() for p in raw.split(",") if p.strip()]
+        if not patterns:
+            return None
+        if not background:
+            return self.warmup(patterns)
+        t = threading.Thread(target=self.warmup, args=(patterns,), name="model-warmup", daemon=True)
+        t.start()
+        return t
+
+    def preload_from_env(self):
+        """Load MODEL_PRELOAD artifacts now, in the importing (parent) process.
+
+        gc.freeze() afterwards moves everything allocated so far out of the
+        collector's reach, so garbage collections in forked workers do not
+        write to (and thereby copy) the shared pages.
+        """
+        raw = os.environ.get(PRELOAD_ENV, "")
+        patterns = [p.strip() for p in raw.split(",") if p.strip()]
+        if not patterns:
+            return None
+        errors = self.warmup(patterns)
+        for name, error in errors.items():
+            print(f"✗ Preload failed for {name}: {error}")
+        gc.freeze()
+        return errors
+
+    def status(self):
+        arts = {n: a.status() for n, a in self._artifacts.items()}
+        loaded = [s for s in arts.values() if s["loaded"]]
+        return {
+            "registered": len(arts),
+            "loaded": len(loaded),
+            # Values swapped in with replace() may have no timing
+            "total_load_seconds": round(sum(s["load_seconds"] or 0 for s in loaded), 4),
+            "rss_bytes": _rss(),
+            "artifacts": arts,
+        }
+
+
+registry = ModelRegistry()
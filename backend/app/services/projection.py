@@ -0,0 +1,137 @@
+import re
+
+import numpy as np
+import scipy.sparse as sp
+
+# Largest |projector - sklearn| accepted when a projector is built; float32
+# rounding alone stays around 1e-7 on these components.
+TOLERANCE = 1e-4
+
+
+class TermProjector:
+    """Inference-only TfidfVectorizer + TruncatedSVD, folded into one float32 table.
+
+    Row t of `weights` is idf[t] * svd.components_[:, t], so the projection of a
+    document is the count-weighted sum of the rows of its terms, divided by the
+    L2 norm of its TF-IDF vector. No sparse TF-IDF row or float64 components
+    matrix is built per request, and `weights` is a plain array that joblib
+    mmap_mode="r" (MODEL_MMAP_DIR) shares between workers.
+    """
+
+    def __init__(self, vocabulary, idf, weights, token_pattern, ngram_range, lowercase=True, norm="l2"):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.norm = norm
+        self._tokens = None
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, svd, dtype=np.float32):
+        """Fold a fitted word TfidfVectorizer and TruncatedSVD; ValueError for options it can't reproduce."""
+        unsupported = {
+            "analyzer": vectorizer.analyzer != "word",
+            "preprocessor": vectorizer.preprocessor is not None,
+            "tokenizer": vectorizer.tokenizer is not None,
+            "stop_words": vectorizer.stop_words is not None,
+            "strip_accents": vectorizer.strip_accents is not None,
+            "binary": vectorizer.binary,
+            "sublinear_tf": vectorizer.sublinear_tf,
+            "norm": vectorizer.norm not in ("l2", None),
+        }
+        bad = [name for name, flag in unsupported.items() if flag]
+        if bad:
+            raise ValueError(f"TermProjector does not support TfidfVectorizer options: {', '.join(bad)}")
+        n_terms = len(vectorizer.vocabulary_)
+        if svd.components_.shape[1] != n_terms:
+            raise ValueError(f"SVD has {svd.components_.shape[1]} input columns, the vectorizer {n_terms} terms")
+        idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(n_terms)
+        weights = np.ascontiguousarray((svd.components_ * idf).T, dtype=dtype)
+        return cls(
+            vocabulary={term: int(i) for term, i in vectorizer.vocabulary_.items()},
+            idf=np.asarray(idf, dtype=dtype),
+            weights=weights,
+            token_pattern=vectorizer.token_pattern,
+            ngram_range=vectorizer.ngram_range,
+            lowercase=vectorizer.lowercase,
+            norm=vectorizer.norm,
+        )
+
+    @property
+    def n_components(self):
+        return self.weights.shape[1]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_tokens"] = None  # compiled pattern, rebuilt on first use
+        return state
+
+    def terms(self, doc):
+        """Vocabulary ids of the word n-grams of doc, as TfidfVectorizer's analyzer produces them."""
+        if self._tokens is None:
+            self._tokens = re.compile(self.token_pattern)
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self._tokens.findall(doc)
+        lo, hi = self.ngram_range
+        vocab = self.vocabulary
+        ids = []
+        for n in range(lo, hi + 1):
+            for i in range(len(tokens) - n + 1):
+                j = vocab.get(tokens[i] if n == 1 else " ".join(tokens[i:i + n]))
+                if j is not None:
+                    ids.append(j)
+        return ids
+
+    def term_rows(self, docs):
+        """CSR of normalized term frequencies: term_rows(docs) @ weights == transform(docs)."""
+        docs = list(docs)
+        ids, doc_of = [], []
+        for d, doc in enumerate(docs):
+            found = self.terms(doc)
+            ids.extend(found)
+            doc_of.extend([d] * len(found))
+        # Repeated (doc, term) pairs are summed into counts by the COO -> CSR conversion
+        rows = sp.coo_matrix(
+            (np.ones(len(ids), dtype=self.weights.dtype), (doc_of, ids)),
+            shape=(len(docs), len(self.vocabulary)),
+        ).tocsr()
+        if self.norm == "l2" and rows.nnz:
+            row_of = np.repeat(np.arange(len(docs)), np.diff(rows.indptr))
+            w = rows.data * self.idf[rows.indices]
+            rows.data /= np.sqrt(np.bincount(row_of, weights=w * w, minlength=len(docs)))[row_of].astype(rows.dtype)
+        return rows
+
+    def project(self, rows):
+        """SVD coordinates of term_rows() output: per document, the weighted sum of its terms' rows."""
+        return np.asarray(rows @ self.weights, dtype=self.weights.dtype)
+
+    def transform(self, docs):
+        """Same result as svd.transform(vectorizer.transform(docs)), in float32."""
+        return self.project(self.term_rows(docs))
+
+    def max_error(self, vectorizer, svd, docs):
+        """Largest absolute difference from the sklearn path over docs."""
+        docs = list(docs)
+        if not docs:
+            return 0.0
+        expected = svd.transform(vectorizer.transform(docs))
+        return float(np.max(np.abs(self.transform(docs) - expected)))
+
+
+def probe_docs(vocabulary, n=200):
+    """Small check set built from the vocabulary itself: single terms and one long document."""
+    terms = sorted(vocabulary, key=vocabulary.get)
+    step = max(1, len(terms) // n)
+    return terms[::step] + [" ".join(terms[::step])]
+
+
+def build_projector(vectorizer, svd, tolerance=TOLERANCE):
+    """TermProjector.from_sklearn, refused (ValueError) if it drifts from sklearn by more than tolerance."""
+    projector = TermProjector.from_sklearn(vectorizer, svd)
+    error = projector.max_error(vectorizer, svd, probe_docs(vectorizer.vocabulary_))
+    if error > tolerance:
+        raise ValueError(f"TermProjector differs from sklearn by {error:.2e} (tolerance {tolerance:.0e})")
+    return projector
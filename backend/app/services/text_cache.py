@@ -0,0 +1,135 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import scipy.sparse as sp
+
+# Entries shared by every vectorizer (one entry = one text's sparse row for one
+# vectorizer); override per process with TEXT_CACHE_SIZE. 0 disables caching.
+CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", "8192"))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_text(t: str) -> str:
+    """Lowercase, keep [a-z0-9] and single spaces: the feature text of the ilyes models."""
+    t = str(t).lower()
+    t = re.sub(r"[^a-z0-9\s]", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+class TextVectorCache:
+    """LRU of normalized text -> sparse row, keyed per vectorizer.
+
+    rows() looks every text up under the vectorizer's name, vectorizes only the
+    misses (duplicates within the call once) in a single transform and stores
+    each row as its (indices, data) arrays. When the registry hands out a new
+    vectorizer object for a name (reset/replace), that name's entries are dropped.
+    Concurrent single-row requests already reach each model through one
+    MicroBatcher thread, so the second caller of a posting is either in the same
+    batch or a cache hit.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self._cache = OrderedDict()  # (name, text) -> (indices, data)
+        self._owners = {}  # name -> (vectorizer, n_columns)
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+
+    def _owner(self, name, vectorizer):
+        owner = self._owners.get(name)
+        if owner is not None and owner[0] is not vectorizer:
+            for key in [k for k in self._cache if k[0] == name]:
+                del self._cache[key]
+            owner = None
+        return owner
+
+    def rows(self, name, vectorizer, texts, transform=None):
+        """CSR with one row per text, equal to transform(texts) (default vectorizer.transform)."""
+        transform = transform or vectorizer.transform
+        texts = list(texts)
+        if not texts:
+            return sp.csr_matrix(transform(texts))
+        found, missing = {}, []
+        with self._lock:
+            owner = self._owner(name, vectorizer)
+            for text in texts:
+                if text in found:
+                    continue
+                entry = self._cache.get((name, text))
+                if entry is None:
+                    found[text] = None
+                    missing.append(text)
+                else:
+                    self._cache.move_to_end((name, text))
+                    found[text] = entry
+            self.hits[name] = self.hits.get(name, 0) + len(texts) - len(missing)
+            self.misses[name] = self.misses.get(name, 0) + len(missing)
+        if missing:
+            X = sp.csr_matrix(transform(missing))
+            owner = (vectorizer, X.shape[1])
+            for i, text in enumerate(missing):
+                lo, hi = X.indptr[i], X.indptr[i + 1]
+                found[text] = (X.indices[lo:hi].copy(), X.data[lo:hi].copy())
+            with self._lock:
+                self._owner(name, vectorizer)
+                self._owners[name] = owner
+                if self.max_size > 0:
+                    for text in missing:
+                        self._cache[(name, text)] = found[text]
+                        self._cache.move_to_end((name, text))
+                    while len(self._cache) > self.max_size:
+                        self._cache.popitem(last=False)
+        parts = [found[text] for text in texts]
+        indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(ix) for ix, _ in parts], out=indptr[1:])
+        return sp.csr_matrix(
+            (np.concatenate([d for _, d in parts]), np.concatenate([ix for ix, _ in parts]), indptr),
+            shape=(len(parts), owner[1]),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._owners.clear()
+
+    def stats(self):
+        with self._lock:
+            names = sorted(set(self.hits) | set(self.misses))
+            per_name = {
+                name: {
+                    "entries": sum(1 for k in self._cache if k[0] == name),
+                    "hits": self.hits.get(name, 0),
+                    "misses": self.misses.get(name, 0),
+                }
+                for name in names
+            }
+            size = len(self._cache)
+        info = clean_text.cache_info()
+        return {
+            "cache_size": size,
+            "cache_capacity": self.max_size,
+            "vectorizers": per_name,
+            "clean_text": {"hits": info.hits, "misses": info.misses, "size": info.currsize},
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def text_cache() -> TextVectorCache:
+    """Return the process-wide cache, creating it on first call."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TextVectorCache()
+        return _cache
+
+
+def text_cache_status():
+    return text_cache().stats()
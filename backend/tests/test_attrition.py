@@ -0,0 +1,61 @@
+"""FeatureEncoder (attrition one-hot encoding) against the column-by-column lookup it replaced."""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.routers.ahmed.attrition import FeatureEncoder, InputData, _BINARY, _NUMERIC, _ORDINALS, _read_batch_csv
+
+RECORD = dict(
+    Age=30, Years_at_Company=5, Monthly_Income=4200.0, Number_of_Promotions=1, Distance_from_Home=12,
+    Number_of_Dependents=2, Work_Life_Balance="Good", Job_Satisfaction="High", Performance_Rating="Average",
+    Employee_Recognition="Low", Overtime="Yes", Leadership_Opportunities="No", Innovation_Opportunities="No",
+    Company_Reputation="Good", Job_Role="Finance", Job_Level="Mid", Company_Size="Medium", Remote_Work="No",
+    Education_Level="Master's Degree", Gender="Male", Marital_Status="Married",
+)
+
+# "Job Role_Finance" and "Job Role_FINANCE" both normalize to "finance"
+COLS = [
+    *_NUMERIC.values(), *(c for c, _ in _ORDINALS.values()), *(f"{c}_Yes" for c in _BINARY.values()), "Gender_Male",
+    "Company Reputation_Good", "Job Role_Finance", "Job Role_FINANCE", "Job Role_Media",
+    "Job Level_Mid", "Company Size_Medium", "Education Level_Master's Degree", "Marital Status_Married",
+]
+
+
+def baseline_strict(pref, v, cols):
+    vv = v.strip().lower()
+    for c in cols:
+        if c.lower() == f"{pref}_{vv}".lower(): return c
+    raise HTTPException(status_code=400, detail={"type": "invalid_category", "field": pref, "value": v})
+
+
+def test_duplicate_label_sets_the_first_matching_column():
+    encoder = FeatureEncoder(COLS)
+    expected = COLS.index(baseline_strict("Job Role", RECORD["Job_Role"], COLS))
+    assert expected == COLS.index("Job Role_Finance")
+
+    row = encoder.encode(InputData(**RECORD))[0]
+    assert row[expected] == 1 and row[COLS.index("Job Role_FINANCE")] == 0
+
+    X = encoder.encode_frame(pd.DataFrame([RECORD, {**RECORD, "Job_Role": "finance "}]))
+    np.testing.assert_array_equal(X[:, expected], [1, 1])
+    np.testing.assert_array_equal(X[:, COLS.index("Job Role_FINANCE")], [0, 0])
+
+
+def test_unknown_category_is_400():
+    with pytest.raises(HTTPException) as e:
+        FeatureEncoder(COLS).encode(InputData(**{**RECORD, "Job_Role": "Pilot"}))
+    assert e.value.status_code == 400 and e.value.detail["type"] == "invalid_category"
+
+
+def _csv(records):
+    return pd.DataFrame(records).rename(columns=lambda c: c.replace("_", " ")).to_csv(index=False).encode()
+
+
+def test_batch_csv_rejects_fractional_integers():
+    df = _read_batch_csv(_csv([RECORD, {**RECORD, "Age": 31.0, "Monthly_Income": 4200.5}]))
+    assert df["Age"].tolist() == [30, 31]
+    with pytest.raises(HTTPException) as e:
+        _read_batch_csv(_csv([RECORD, {**RECORD, "Number_of_Dependents": 1.5}]))
+    assert e.value.status_code == 400
+    assert e.value.detail == {"type": "invalid_integer", "field": "Number_of_Dependents", "value": "1.5", "row": 1}
@@ -0,0 +1,188 @@
+"""The HR pipeline against the implementation it replaced.
+
+baseline_run_pipeline is a frozen copy of run_pipeline as it was before the
+user-005 rewrite; only the model objects are passed in instead of imported.
+Every current entry point must give the same employees on
+example_datasets/hr_salary_dataset.csv, with and without missing salaries.
+
+salary_ensemble.joblib is not committed: when it is absent a Ridge fitted on
+the dataset stands in for it, on both sides of the comparison.
+
+    cd backend && python -m pytest tests/test_hr_pipeline.py
+"""
+import gzip
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from sklearn.linear_model import Ridge
+
+from app.routers.yassine.app import _report_chunks
+from app.routers.yassine.ml import models_loader, pipeline
+from app.routers.yassine.ml.pipeline import iter_pipeline, run_pipeline
+from app.routers.yassine.ml.reports import to_records
+from app.services.model_registry import LazyArtifact
+
+DATASET = os.path.join(os.path.dirname(__file__), "..", "..", "example_datasets", "hr_salary_dataset.csv")
+
+
+def baseline_run_pipeline(df, preprocessor, ensemble, kmeans, iso_forest, one_class_svm, elliptic):
+    # ---------- CREATE ADVANCED FEATURES ----------
+    df['exp_performance'] = df['years_experience'] * df['performance_score']
+    df['exp_squared'] = df['years_experience'] ** 2
+    df['exp_cubed'] = df['years_experience'] ** 3
+    df['performance_squared'] = df['performance_score'] ** 2
+    df['salary_per_exp_year'] = df['salary'] / (df['years_experience'] + 1)
+
+    df['is_senior'] = (df['seniority_level'] == 'Senior').astype(int)
+    df['is_high_performer'] = (df['performance_score'] >= 4.5).astype(int)
+    df['senior_high_performer'] = df['is_senior'] * df['is_high_performer']
+
+    df['exp_category'] = pd.cut(df['years_experience'],
+                                bins=[0, 2, 5, 10, 20, 50],
+                                labels=['Entry', 'Junior', 'Mid', 'Senior', 'Expert'])
+
+    df['dept_size'] = df.groupby('department')['employee_id'].transform('count')
+    df['location_size'] = df.groupby('location')['employee_id'].transform('count')
+    df['title_words'] = df['job_title'].str.split().str.len()
+
+    # ---------- Salary Prediction ----------
+    if hasattr(preprocessor, "feature_names_in_"):
+        expected_cols = list(preprocessor.feature_names_in_)
+        available_cols = [c for c in expected_cols if c in df.columns]
+        X = df[available_cols]
+    else:
+        X = df.copy()
+
+    X_transformed = preprocessor.transform(X)
+    df['predicted_salary'] = ensemble.predict(X_transformed)
+    df['market_rate_title_loc'] = df.groupby(['job_title', 'location'])['salary'].transform('median')
+    df['market_rate_title'] = df.groupby('job_title')['salary'].transform('median')
+    df['salary_gap'] = df['salary'] - df['predicted_salary']
+    df['vs_market'] = ((df['salary'] - df['market_rate_title_loc']) / df['market_rate_title_loc']) * 100
+
+    # ---------- Clustering ----------
+    cluster_cols = ['years_experience', 'performance_score', 'dept_size']
+    X_cluster = df[cluster_cols].copy()
+    X_cluster = (X_cluster - X_cluster.mean()) / X_cluster.std()
+    df['peer_group'] = kmeans.predict(X_cluster)
+
+    # ---------- Anomaly Detection ----------
+    anomaly_features = df[['salary', 'years_experience', 'performance_score', 'salary_gap', 'vs_market']].fillna(0)
+    votes = iso_forest.predict(anomaly_features) + one_class_svm.predict(anomaly_features) + elliptic.predict(anomaly_features)
+    df['is_anomaly'] = votes < 0
+    df['anomaly_type'] = df['salary_gap'].apply(lambda x: "Underpaid" if x < 0 else "Overpaid")
+
+    # ---------- Retention Risk ----------
+    df['retention_risk'] = df.apply(
+        lambda r:
+            "High" if r['anomaly_type'] == "Underpaid" and r['performance_score'] >= 4
+            else "Medium" if r['salary_gap'] < 0
+            else "Low",
+        axis=1
+    )
+
+    # ---------- CONVERT TO JSON-SERIALIZABLE FORMAT ----------
+    for col in df.select_dtypes(include=['category']).columns:
+        df[col] = df[col].astype(str)
+
+    result = df.to_dict(orient='records')
+
+    def clean_value(val):
+        if isinstance(val, (np.integer, np.int64, np.int32)):
+            return int(val)
+        elif isinstance(val, (np.floating, np.float64, np.float32)):
+            return float(val)
+        elif isinstance(val, np.bool_):
+            return bool(val)
+        elif isinstance(val, np.ndarray):
+            return val.tolist()
+        elif pd.isna(val):
+            return None
+        return val
+
+    return [{k: clean_value(v) for k, v in record.items()} for record in result]
+
+
+def salary_features(df):
+    """The preprocessor's input columns, derived as baseline_run_pipeline derives them."""
+    df = df.copy()
+    df['exp_performance'] = df['years_experience'] * df['performance_score']
+    df['exp_squared'] = df['years_experience'] ** 2
+    df['exp_cubed'] = df['years_experience'] ** 3
+    df['performance_squared'] = df['performance_score'] ** 2
+    df['is_senior'] = (df['seniority_level'] == 'Senior').astype(int)
+    df['is_high_performer'] = (df['performance_score'] >= 4.5).astype(int)
+    df['senior_high_performer'] = df['is_senior'] * df['is_high_performer']
+    df['exp_category'] = pd.cut(df['years_experience'],
+                                bins=[0, 2, 5, 10, 20, 50],
+                                labels=['Entry', 'Junior', 'Mid', 'Senior', 'Expert'])
+    df['dept_size'] = df.groupby('department')['employee_id'].transform('count')
+    df['location_size'] = df.groupby('location')['employee_id'].transform('count')
+    df['title_words'] = df['job_title'].str.split().str.len()
+    return df
+
+
+@pytest.fixture(scope="module")
+def models():
+    with pytest.MonkeyPatch.context() as mp:
+        if not os.path.exists(os.path.join(models_loader.MODEL_DIR, "salary_ensemble.joblib")):
+            df = pd.read_csv(DATASET)
+            preprocessor = models_loader.preprocessor.get()
+            X = preprocessor.transform(salary_features(df)[list(preprocessor.feature_names_in_)])
+            stand_in = Ridge().fit(X, df['salary'])
+            mp.setattr(pipeline, "ensemble", LazyArtifact("yassine.salary_ensemble", lambda: stand_in))
+        yield {
+            name: getattr(pipeline, name).get()
+            for name in ("preprocessor", "ensemble", "kmeans", "iso_forest", "one_class_svm", "elliptic")
+        }
+
+
+@pytest.fixture(params=["complete", "missing_salaries"])
+def csv_file(request, tmp_path):
+    df = pd.read_csv(DATASET)
+    if request.param == "missing_salaries":
+        df.loc[::7, 'salary'] = np.nan
+    path = tmp_path / "hr.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def expected(models, csv_file):
+    return pd.DataFrame(baseline_run_pipeline(pd.read_csv(csv_file), **models))
+
+
+def as_frame(records):
+    # The baseline turned categoricals into str, so the exp_category of years_experience == 0
+    # (outside the first pd.cut bin) was the string 'nan'; to_records gives None
+    df = pd.DataFrame(records)
+    df['exp_category'] = df['exp_category'].fillna('nan')
+    return df
+
+
+def test_run_pipeline_matches_baseline(csv_file, expected):
+    got = as_frame(to_records(run_pipeline(pd.read_csv(csv_file))))
+    assert_frame_equal(got, expected)
+
+
+# 37 leaves a short last chunk, 1000 splits the 5000 rows evenly
+@pytest.mark.parametrize("chunksize", [37, 1000])
+def test_iter_pipeline_matches_baseline(csv_file, expected, chunksize):
+    records = []
+    for chunk in iter_pipeline(csv_file, chunksize):
+        records.extend(to_records(chunk))
+    assert_frame_equal(as_frame(records), expected)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_streamed_report_matches_baseline(csv_file, expected, compress):
+    data = b"".join(_report_chunks(csv_file, 1000, compress))
+    if compress:
+        data = gzip.decompress(data)
+    got = pd.read_csv(io.BytesIO(data))
+    want = pd.read_csv(io.StringIO(expected.to_csv(index=False)))
+    assert_frame_equal(got, want)
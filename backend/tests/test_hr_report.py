@@ -0,0 +1,48 @@
+"""/hr/download-report and /hr/upload-csv on input the pipeline can't score.
+
+The report is streamed, so these errors have to surface before the status
+line: a bad CSV is a 400 and a model that won't load a 500, never a 200
+with an empty or truncated CSV.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.yassine import app as hr
+from app.routers.yassine.ml import pipeline
+from app.services.model_registry import LazyArtifact
+
+VALID_HEADER = "employee_id,job_title,department,education_level,location,seniority_level,gender,years_experience,performance_score,salary\n"
+VALID_ROW = "10000,Mobile Developer,IT,Master,Nabeul,Mid,M,7,2.71,8776\n"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(hr.router)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def post(client, path, body, **params):
+    return client.post(path, params=params, files={"file": ("hr.csv", body, "text/csv")})
+
+
+@pytest.mark.parametrize("path", ["/hr/download-report", "/hr/upload-csv"])
+@pytest.mark.parametrize("body", ["a,b\n1,2\n", ""])
+def test_missing_columns_is_400(client, path, body):
+    response = post(client, path, body)
+    assert response.status_code == 400
+    assert response.json()["detail"]["type"] == "missing_columns"
+    assert "department" in response.json()["detail"]["columns"]
+    assert hr.REPORT_LIMIT.active == 0
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_model_that_fails_to_load_is_500(client, monkeypatch, compress):
+    def missing():
+        raise FileNotFoundError("kmeans_peer_groups.joblib")
+
+    monkeypatch.setattr(pipeline, "kmeans", LazyArtifact("yassine.kmeans_peer_groups", missing))
+    response = post(client, "/hr/download-report", VALID_HEADER + VALID_ROW * 3, compress=compress)
+    assert response.status_code == 500
+    assert hr.REPORT_LIMIT.active == 0
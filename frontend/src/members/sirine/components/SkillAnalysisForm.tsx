@@ -279,21 +279,39 @@ const SkillAnalysisForm = () => {
   const [availableSkills, setAvailableSkills] = useState([]);
   const [jobTitles, setJobTitles] = useState([]);
 
-  // Fetch available skills and job titles
-  useEffect(() => {
-    const API_BASE = 'http://localhost:8000';
-    
-    fetch(`${API_BASE}/api/available-skills/`)
-      .then(res => res.json())
-      .then(data => setAvailableSkills(data))
-      .catch(err => console.error("Failed to fetch skills:", err));
+  const API_BASE = 'http://localhost:8000';
 
+  // Fetch job titles (small list, revalidated by the browser through its ETag)
+  useEffect(() => {
     fetch(`${API_BASE}/api/job-titles/`)
       .then(res => res.json())
       .then(data => setJobTitles(data))
       .catch(err => console.error("Failed to fetch job titles:", err));
   }, []);
 
+  // Skill suggestions come from the server-side search instead of the full vocabulary
+  // (match=contains: "script" still suggests "JavaScript", prefix matches first)
+  useEffect(() => {
+    const query = formData.currentSkill.trim();
+    if (!query) {
+      setAvailableSkills([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`${API_BASE}/api/available-skills/?q=${encodeURIComponent(query)}&match=contains&limit=20`, { signal: controller.signal })
+        .then(res => res.json())
+        .then(data => setAvailableSkills(data))
+        .catch(err => {
+          if (err.name !== 'AbortError') console.error("Failed to fetch skills:", err);
+        });
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [formData.currentSkill]);
+
   const handleAddSkill = () => {
     if (formData.currentSkill && !formData.skills.includes(formData.currentSkill)) {
       setFormData(prev => ({